@@ -0,0 +1,328 @@
+import json
+import os
+import random
+import socket
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import AI_TOKENS, HTTP_RESPONSES, HTTP_RETRIES, STAGE_SECONDS, inc, observe, timer
+
+DEFAULT_MODEL = "deepseek/deepseek-r1-0528-qwen3-8b:free"
+# Bisa diarahkan ke server stub lokal lewat environment variable
+DEFAULT_BASE_URL = "https://openrouter.ai/api/v1"
+TEMPERATURE = 0.7
+MAX_TOKENS = 1000
+
+# Pesan yang dikembalikan ke pengguna saat permintaan tidak berhasil
+MISSING_KEY_MESSAGE = "🔑 Silakan masukkan API Key OpenRouter di sidebar"
+ERROR_PREFIX = "Maaf, terjadi kesalahan"
+STREAM_ERROR_PREFIX = "Maaf, streaming terputus"
+
+# Timeout (connect, read) per model; model besar butuh waktu baca lebih lama
+MODEL_TIMEOUTS = {
+    "deepseek/deepseek-r1-0528-qwen3-8b:free": (5, 60),
+    "qwen/qwen3-235b-a22b:free": (5, 120),
+    "google/gemma-3-12b-it:free": (5, 45)
+}
+DEFAULT_TIMEOUT = (5, 30)
+
+# Pool koneksi bersama dan kebijakan retry
+POOL_CONNECTIONS = 4  # jumlah host yang koneksinya disimpan
+POOL_MAXSIZE = int(os.environ.get("OPENROUTER_POOL_MAXSIZE", 16))  # koneksi per host
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5  # detik
+BACKOFF_MAX = 8.0  # batas jeda backoff acak
+RETRY_AFTER_MAX = 30.0  # Retry-After lebih lama dari ini tidak ditunggu
+CANCEL_POLL = 0.2  # detik, selang pemeriksaan pembatalan streaming
+
+_session = None
+_session_lock = threading.Lock()
+
+class RequestCancelled(RuntimeError):
+    """Permintaan dibatalkan lewat `cancel` sebelum respons diterima"""
+
+# ====================== KONEKSI HTTP ======================
+def get_session():
+    """Session HTTP bersama per proses dengan keep-alive dan pool koneksi terbatas"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                # Tanpa pool_block: requests tidak punya batas waktu menunggu slot pool,
+                # jadi permintaan di atas POOL_MAXSIZE membuka koneksi tambahan yang
+                # dibuang setelah selesai. Jumlah permintaan serentak sudah dibatasi
+                # worker AI_SCHEDULER, sehingga hal ini jarang terjadi.
+                adapter = HTTPAdapter(
+                    pool_connections=POOL_CONNECTIONS,
+                    pool_maxsize=POOL_MAXSIZE,
+                    pool_block=False,
+                    max_retries=0
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+def get_timeout(model):
+    """Timeout (connect, read) untuk model tertentu"""
+    return MODEL_TIMEOUTS.get(model, DEFAULT_TIMEOUT)
+
+def _retry_after_seconds(response):
+    """Baca header Retry-After (detik atau tanggal HTTP); None jika tidak ada"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+def _backoff_delay(attempt):
+    """Jeda exponential backoff dengan full jitter"""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+def _wait(delay, cancel):
+    """Tunggu `delay` detik; RequestCancelled begitu `cancel` diset"""
+    if cancel is None:
+        time.sleep(delay)
+    elif cancel.wait(delay):
+        raise RequestCancelled("permintaan dibatalkan")
+
+def post_with_retry(url, model, max_retries=MAX_RETRIES, cancel=None, **kwargs):
+    """POST lewat session bersama; ulangi error koneksi dan status 429/5xx.
+
+    Jeda antar percobaan mengikuti Retry-After bila ada, selain itu backoff
+    eksponensial dengan jitter. Respons terakhir dikembalikan apa adanya
+    sehingga pemanggil tetap memakai raise_for_status().
+
+    `cancel` (threading.Event, opsional) memutus jeda retry dan mencegah
+    percobaan berikutnya dengan RequestCancelled.
+    """
+    session = get_session()
+    kwargs.setdefault("timeout", get_timeout(model))
+    for attempt in range(max_retries + 1):
+        if cancel is not None and cancel.is_set():
+            raise RequestCancelled("permintaan dibatalkan")
+        try:
+            response = session.post(url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            inc(HTTP_RESPONSES, status=type(e).__name__)
+            if attempt == max_retries:
+                raise
+            inc(HTTP_RETRIES, reason=type(e).__name__)
+            _wait(_backoff_delay(attempt), cancel)
+            continue
+
+        inc(HTTP_RESPONSES, status=str(response.status_code))
+        if response.status_code not in RETRY_STATUSES or attempt == max_retries:
+            return response
+
+        delay = _retry_after_seconds(response)
+        if delay is None:
+            delay = _backoff_delay(attempt)
+        elif delay > RETRY_AFTER_MAX:
+            return response
+        inc(HTTP_RETRIES, reason=str(response.status_code))
+        # Kembalikan koneksi ke pool sebelum menunggu
+        response.close()
+        _wait(delay, cancel)
+
+# ====================== FUNGSI AI CHAT ======================
+def _chat_url(base_url=None):
+    """URL endpoint chat completions OpenRouter"""
+    base_url = base_url or os.environ.get("OPENROUTER_BASE_URL") or DEFAULT_BASE_URL
+    return f"{base_url.rstrip('/')}/chat/completions"
+
+def _build_request(prompt, model, api_key, stream=False):
+    """Susun header dan payload permintaan chat completions.
+
+    `prompt` berupa teks tunggal atau daftar pesan {'role', 'content'}.
+    """
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    }
+
+    payload = {
+        "model": model,
+        "messages": [{"role": "user", "content": prompt}] if isinstance(prompt, str) else list(prompt),
+        "temperature": TEMPERATURE,
+        "max_tokens": MAX_TOKENS
+    }
+    if stream:
+        payload["stream"] = True
+        # Minta OpenRouter mengirim jumlah token di event terakhir
+        payload["usage"] = {"include": True}
+    return headers, payload
+
+def _record_usage(usage, model):
+    """Catat jumlah token prompt dan completion dari field `usage`"""
+    if not usage:
+        return
+    for kind in ("prompt", "completion"):
+        tokens = usage.get(f"{kind}_tokens")
+        if tokens is not None:
+            observe(AI_TOKENS, tokens, kind=kind, model=model)
+
+def get_ai_response(prompt, model=DEFAULT_MODEL, api_key=None, base_url=None, cancel=None):
+    """Dapatkan respons dari OpenRouter API; `cancel` seperti pada post_with_retry"""
+    if not api_key:
+        return MISSING_KEY_MESSAGE
+
+    headers, payload = _build_request(prompt, model, api_key)
+
+    try:
+        with timer("get_ai_response"):
+            response = post_with_retry(
+                _chat_url(base_url),
+                model,
+                cancel=cancel,
+                headers=headers,
+                json=payload
+            )
+            response.raise_for_status()
+            body = response.json()
+        _record_usage(body.get('usage'), model)
+        return body['choices'][0]['message']['content']
+    except Exception as e:
+        return f"{ERROR_PREFIX}: {str(e)}"
+
+def iter_sse_data(lines):
+    """Urai baris server-sent events dan hasilkan isi field `data` per event"""
+    data = []
+    for line in lines:
+        if not line:
+            # Baris kosong menandai akhir satu event
+            if data:
+                yield "\n".join(data)
+                data = []
+            continue
+        if line.startswith(":"):
+            # Komentar/keep-alive, misalnya ": OPENROUTER PROCESSING"
+            continue
+        field, _, value = line.partition(":")
+        if field == "data":
+            data.append(value[1:] if value.startswith(" ") else value)
+    if data:
+        yield "\n".join(data)
+
+class _CancelWatch:
+    """Putus socket respons streaming begitu `cancel` diset, juga saat sedang menunggu token.
+
+    response.close() dari thread lain tidak membangunkan pembacaan yang sedang
+    menunggu, sehingga socket di-shutdown; pembaca lalu mendapat error dan
+    koneksinya dibuang, bukan dikembalikan ke pool.
+    """
+    def __init__(self, response, cancel):
+        self._response = response
+        self._cancel = cancel
+        self._done = False
+        self._lock = threading.Lock()
+        threading.Thread(target=self._watch, name="ai-stream-cancel", daemon=True).start()
+
+    def _watch(self):
+        while not self._cancel.wait(CANCEL_POLL):
+            if self._done:
+                return
+        with self._lock:
+            if self._done:
+                return
+            sock = getattr(getattr(self._response.raw, "connection", None), "sock", None)
+            if sock is not None:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        with self._lock:
+            self._done = True
+
+def stream_ai_response(prompt, model=DEFAULT_MODEL, api_key=None, base_url=None, cancel=None):
+    """Hasilkan potongan teks respons OpenRouter begitu token tiba (untuk st.write_stream).
+
+    Jika aliran SSE rusak sebelum token pertama, jatuh kembali ke mode
+    non-streaming `get_ai_response`. Kegagalan HTTP atau koneksi (yang sudah
+    diulang oleh post_with_retry) langsung dikembalikan sebagai pesan kesalahan.
+
+    `cancel` (threading.Event, opsional) menghentikan streaming tanpa pesan apa
+    pun: jeda retry dan fallback dilewati, dan koneksi langsung diputus
+    walaupun token berikutnya belum tiba.
+    """
+    if not api_key:
+        yield MISSING_KEY_MESSAGE
+        return
+    if cancel is not None and cancel.is_set():
+        return
+
+    headers, payload = _build_request(prompt, model, api_key, stream=True)
+    connected = False
+    received = False
+    start = time.perf_counter()
+
+    try:
+        with post_with_retry(
+            _chat_url(base_url),
+            model,
+            cancel=cancel,
+            headers=headers,
+            json=payload,
+            stream=True
+        ) as response, (_CancelWatch(response, cancel) if cancel is not None else nullcontext()):
+            response.raise_for_status()
+            connected = True
+            response.encoding = "utf-8"
+            # chunk_size=None: teruskan setiap chunk begitu tiba, tanpa menunggu buffer penuh
+            for data in iter_sse_data(response.iter_lines(chunk_size=None, decode_unicode=True)):
+                if data == "[DONE]":
+                    break
+                event = json.loads(data)
+                if "error" in event:
+                    raise RuntimeError(event["error"].get("message", event["error"]))
+                _record_usage(event.get("usage"), model)
+                choices = event.get("choices") or [{}]
+                content = choices[0].get("delta", {}).get("content")
+                if cancel is not None and cancel.is_set():
+                    return
+                if content:
+                    if not received:
+                        observe(STAGE_SECONDS, time.perf_counter() - start, stage="ai_first_token")
+                    received = True
+                    yield content
+        observe(STAGE_SECONDS, time.perf_counter() - start, stage="ai_stream")
+    except Exception as e:
+        if cancel is not None and cancel.is_set():
+            return
+        if received:
+            yield f"\n\n{STREAM_ERROR_PREFIX}: {str(e)}"
+        elif not connected or isinstance(e, (requests.ConnectionError, requests.Timeout)):
+            # Mengulang lewat get_ai_response hanya menggandakan retry yang sudah gagal
+            yield f"{ERROR_PREFIX}: {str(e)}"
+        else:
+            response = get_ai_response(prompt, model, api_key, base_url, cancel=cancel)
+            if cancel is None or not cancel.is_set():
+                yield response
+
+def is_error_response(text):
+    """True jika teks adalah pesan kesalahan dari klien ini, bukan jawaban model"""
+    return (
+        text == MISSING_KEY_MESSAGE
+        or text.startswith(ERROR_PREFIX)
+        or STREAM_ERROR_PREFIX in text
+    )
@@ -0,0 +1,246 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from ai_scheduler import AI_SCHEDULER, QueueFullError
+from metrics import AI_HEDGE_ATTEMPTS, AI_HEDGE_WINS, inc
+
+HEDGE_MODEL = "auto"  # nilai pilihan model untuk mode tercepat
+DEFAULT_HEDGE_DELAY = float(os.environ.get("FPA_HEDGE_DELAY", 4.0))  # detik, sebelum data latensi cukup
+MIN_HEDGE_DELAY = 0.5
+MAX_HEDGE_DELAY = 20.0
+HEDGE_QUANTILE = 0.9  # jeda adaptif = kuantil latensi token pertama model utama
+LATENCY_WINDOW = 50  # sampel latensi terakhir per model
+MIN_SAMPLES = 5  # sampel minimum sebelum jeda hedge memakai statistik
+FAILURE_PENALTY = 30.0  # detik tambahan per tingkat kegagalan saat mengurutkan model
+
+# ====================== STATISTIK LATENSI MODEL ======================
+class ModelLatency:
+    """Latensi token pertama dan status berhasil per model (jendela bergulir).
+
+    Percobaan yang kalah dicatat sebagai sampel tersensor (waktu sampai dibatalkan,
+    batas bawah latensinya) agar model yang melambat ikut turun peringkatnya.
+    """
+    def __init__(self, window=LATENCY_WINDOW):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, model, seconds, ok):
+        with self._lock:
+            samples = self._samples.get(model)
+            if samples is None:
+                samples = self._samples[model] = deque(maxlen=self.window)
+            samples.append((seconds, ok))
+
+    def record_censored(self, model, seconds):
+        """Catat percobaan yang dibatalkan sebelum token pertama; `seconds` adalah batas bawah
+        latensinya, jadi hanya dicatat bila lebih lambat dari median model yang sudah ada"""
+        p50 = self.summary(model)['p50']
+        if p50 is not None and seconds > p50:
+            self.record(model, seconds, True)
+
+    def summary(self, model):
+        """Jumlah sampel, p50/p90 latensi yang berhasil (detik) dan tingkat kegagalan"""
+        with self._lock:
+            samples = list(self._samples.get(model, ()))
+        latencies = sorted(seconds for seconds, ok in samples if ok)
+
+        def quantile(q):
+            return latencies[min(int(q * len(latencies)), len(latencies) - 1)] if latencies else None
+
+        return {
+            'model': model,
+            'n': len(samples),
+            'p50': quantile(0.5),
+            'p90': quantile(HEDGE_QUANTILE),
+            'gagal': sum(1 for _, ok in samples if not ok) / len(samples) if samples else 0.0
+        }
+
+    def summaries(self):
+        """Ringkasan semua model yang pernah tercatat"""
+        with self._lock:
+            models = list(self._samples)
+        return [self.summary(model) for model in models]
+
+    def expected_latency(self, model):
+        """Skor urutan: median latensi ditambah penalti kegagalan; default untuk model tanpa sampel"""
+        summary = self.summary(model)
+        if not summary['n']:
+            return DEFAULT_HEDGE_DELAY
+        return (summary['p50'] or MAX_HEDGE_DELAY) + FAILURE_PENALTY * summary['gagal']
+
+    def rank(self, models):
+        """Urutkan model dari perkiraan tercepat; urutan asal dipakai saat skor sama"""
+        return sorted(models, key=lambda m: (self.expected_latency(m), models.index(m)))
+
+    def hedge_delay(self, model):
+        """Jeda sebelum mengirim ke model cadangan: p90 latensi model utama, dibatasi"""
+        summary = self.summary(model)
+        if summary['n'] < MIN_SAMPLES or summary['p90'] is None:
+            return DEFAULT_HEDGE_DELAY
+        return min(max(summary['p90'], MIN_HEDGE_DELAY), MAX_HEDGE_DELAY)
+
+MODEL_LATENCY = ModelLatency()
+
+# ====================== PERMINTAAN HEDGED ======================
+def _attempt(index, prompt, model, api_key, base_url, cancel, events, latency):
+    """Streaming satu model ke antrean event; koneksi langsung diputus jika dibatalkan.
+
+    Setiap percobaan yang tidak dibatalkan selalu diakhiri event 'end' atau
+    'error', juga saat terjadi exception, agar koordinator tidak menunggu selamanya.
+    Percobaan yang dibatalkan sebelum token pertama mencatat waktu berjalannya
+    sebagai sampel latensi tersensor; kegagalan dicatat sebagai sampel gagal.
+    """
+    from ai_client import ERROR_PREFIX, STREAM_ERROR_PREFIX, is_error_response, stream_ai_response
+
+    start = time.monotonic()
+    chunks = stream_ai_response(prompt, model, api_key, base_url, cancel=cancel)
+    first = True
+    finished = False
+    try:
+        for chunk in chunks:
+            if cancel.is_set():
+                return
+            if first:
+                first = False
+                failed = is_error_response(chunk)
+                latency.record(model, time.monotonic() - start, not failed)
+                if failed:
+                    events.put((index, 'error', chunk))
+                    finished = True
+                    return
+            events.put((index, 'chunk', chunk))
+        if not cancel.is_set():
+            events.put((index, 'end', None))
+        finished = True
+    except Exception as e:
+        if first:
+            first = False
+            latency.record(model, time.monotonic() - start, False)
+            events.put((index, 'error', f"{ERROR_PREFIX}: {e}"))
+        else:
+            events.put((index, 'error', f"\n\n{STREAM_ERROR_PREFIX}: {e}"))
+        finished = True
+        raise
+    finally:
+        # Menutup generator juga menutup koneksi HTTP yang masih terbuka
+        chunks.close()
+        if first:
+            # Tanpa token pertama: kalah (tersensor), jawaban kosong, atau berhenti tanpa jawaban (gagal)
+            if cancel.is_set():
+                latency.record_censored(model, time.monotonic() - start)
+            else:
+                latency.record(model, time.monotonic() - start, finished)
+        if not finished and not cancel.is_set():
+            events.put((index, 'error', f"{ERROR_PREFIX}: percobaan {model} berhenti tanpa jawaban"))
+
+def hedged_stream(prompt, models, api_key, base_url=None, hedge_delay=None, outcome=None,
+                  scheduler=AI_SCHEDULER, latency=MODEL_LATENCY):
+    """Streaming jawaban dari model tercepat di antara `models`.
+
+    Model diurutkan menurut statistik latensi. Permintaan dikirim ke model
+    pertama; jika belum ada token setelah `hedge_delay` detik (None = adaptif
+    dari p90 latensi model utama) atau model gagal, model berikutnya ikut
+    dikirimi permintaan. Model yang pertama mengirim token yang valid menang dan
+    sisanya dibatalkan (yang masih mengantre dibuang, koneksi yang sedang
+    berjalan langsung diputus). Model pemenang dan jumlah percobaan
+    dicatat ke dict `outcome` jika diberikan.
+    """
+    from ai_client import ERROR_PREFIX, MISSING_KEY_MESSAGE
+
+    if not api_key:
+        yield MISSING_KEY_MESSAGE
+        return
+    order = latency.rank(list(models))
+    delay = hedge_delay if hedge_delay else latency.hedge_delay(order[0])
+    events = queue.Queue()
+    attempts = []  # (model, cancel event, future)
+    winner = None
+    failures = 0
+    last_error = None
+
+    def launch():
+        model = order[len(attempts)]
+        cancel = threading.Event()
+        try:
+            future = scheduler.submit(
+                _attempt, model, api_key, len(attempts), prompt, model, api_key, base_url, cancel, events, latency
+            )
+        except QueueFullError as e:
+            future = Future()
+            events.put((len(attempts), 'error', f"{ERROR_PREFIX}: {e}"))
+        attempts.append((model, cancel, future))
+        inc(AI_HEDGE_ATTEMPTS, model=model)
+
+    try:
+        launch()
+        next_launch = time.monotonic() + delay
+        while True:
+            timeout = None
+            if winner is None and len(attempts) < len(order):
+                timeout = max(next_launch - time.monotonic(), 0)
+            try:
+                index, kind, payload = events.get(timeout=timeout)
+            except queue.Empty:
+                # Model yang sedang berjalan terlalu lambat: kirim juga ke cadangan berikutnya
+                launch()
+                next_launch = time.monotonic() + delay
+                continue
+
+            if winner is None:
+                if kind == 'error':
+                    failures += 1
+                    last_error = payload
+                    if len(attempts) < len(order):
+                        launch()
+                        next_launch = time.monotonic() + delay
+                    elif failures == len(attempts):
+                        yield last_error
+                        return
+                    continue
+                winner = index
+                inc(AI_HEDGE_WINS, model=attempts[winner][0])
+                if outcome is not None:
+                    outcome['model'] = attempts[winner][0]
+                    outcome['percobaan'] = len(attempts)
+                for i, (_, cancel, future) in enumerate(attempts):
+                    if i != winner:
+                        cancel.set()
+                        future.cancel()
+
+            if index != winner:
+                continue
+            if kind == 'end':
+                return
+            yield payload
+            if kind == 'error':
+                # Model pemenang terputus di tengah jawaban
+                return
+    finally:
+        # Pembaca berhenti lebih awal: batalkan semua percobaan
+        for _, cancel, future in attempts:
+            cancel.set()
+            future.cancel()
+
+def submit_hedged(prompt, models, api_key, base_url=None, hedge_delay=None):
+    """Versi non-streaming: Future berisi jawaban lengkap dari model tercepat.
+
+    Koordinator berjalan di thread sendiri (bukan worker scheduler) agar tidak
+    memakai slot worker yang dibutuhkan percobaannya.
+    """
+    future = Future()
+    outcome = {}
+
+    def run():
+        future.set_running_or_notify_cancel()
+        try:
+            future.set_result("".join(hedged_stream(prompt, models, api_key, base_url, hedge_delay, outcome)))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="ai-hedge", daemon=True).start()
+    return future
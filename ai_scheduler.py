@@ -0,0 +1,222 @@
+import hashlib
+import heapq
+import itertools
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from metrics import AI_QUEUE_DEPTH, AI_QUEUE_WAIT, observe, set_gauge
+
+DEFAULT_WORKERS = int(os.environ.get("FPA_AI_WORKERS", 4))
+# Batas per menit per API key dan per model (0 = tanpa batas); free tier OpenRouter 20 permintaan/menit
+KEY_RPM = float(os.environ.get("FPA_AI_KEY_RPM", 20))
+MODEL_RPM = float(os.environ.get("FPA_AI_MODEL_RPM", 20))
+BURST = float(os.environ.get("FPA_AI_BURST", 3))  # permintaan yang boleh dikirim berturut-turut
+MAX_QUEUE = int(os.environ.get("FPA_AI_MAX_QUEUE", 100))
+STREAM_BUFFER = 256  # potongan streaming yang boleh menumpuk sebelum worker menunggu pembaca
+RELAY_POLL = 0.2  # detik, selang worker memeriksa pembatalan saat buffer penuh
+
+QUEUE_FULL_MESSAGE = "antrean AI penuh, coba lagi sebentar lagi"
+
+_STREAM_END = object()
+
+class QueueFullError(RuntimeError):
+    """Antrean scheduler sudah mencapai MAX_QUEUE"""
+
+# ====================== RATE LIMIT ======================
+class TokenBucket:
+    """Token bucket: `rate` token per detik, maksimal `capacity` token tersimpan.
+
+    reserve() langsung mengambil satu token (saldo boleh negatif) dan
+    mengembalikan waktu token itu tersedia, sehingga permintaan mendapat giliran
+    sesuai urutan datang tanpa ada thread yang menunggu di dalam bucket.
+    """
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return now
+            return now - self._tokens / self.rate
+
+def _key_id(api_key):
+    """API key tidak disimpan apa adanya sebagai kunci bucket"""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+# ====================== SCHEDULER ======================
+class AIScheduler:
+    """Antrean permintaan AI bersama untuk semua sesi dalam satu proses.
+
+    Saat submit, permintaan memesan token dari bucket API key dan bucket model
+    lalu masuk antrean berurutan menurut waktu giliran tersebut. Worker di
+    latar belakang mengambil permintaan yang gilirannya sudah tiba, sehingga
+    key atau model yang sedang dibatasi tidak menahan permintaan lain. Hasilnya
+    berupa Future yang bisa dipantau (done()) atau ditunggu (result()).
+    """
+    def __init__(self, workers=DEFAULT_WORKERS, key_rpm=KEY_RPM, model_rpm=MODEL_RPM,
+                 burst=BURST, max_queue=MAX_QUEUE):
+        self.workers = workers
+        self.key_rpm = key_rpm
+        self.model_rpm = model_rpm
+        self.burst = burst
+        self.max_queue = max_queue
+        self._heap = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._buckets = {}
+        self._threads = []
+        self._running = 0
+
+    def _bucket(self, name, rpm):
+        bucket = self._buckets.get(name)
+        if bucket is None:
+            bucket = self._buckets[name] = TokenBucket(rpm / 60, max(self.burst, 1))
+        return bucket
+
+    def _ready_at(self, api_key, model, now):
+        """Waktu giliran paling awal yang diizinkan oleh bucket key dan model"""
+        ready_at = now
+        if api_key and self.key_rpm > 0:
+            ready_at = max(ready_at, self._bucket(("key", _key_id(api_key)), self.key_rpm).reserve(now))
+        if model and self.model_rpm > 0:
+            ready_at = max(ready_at, self._bucket(("model", model), self.model_rpm).reserve(now))
+        return ready_at
+
+    def _start_workers(self):
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(
+                target=self._work, name=f"ai-scheduler-{len(self._threads)}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _update_depth(self):
+        set_gauge(AI_QUEUE_DEPTH, len(self._heap))
+
+    def submit(self, func, model, api_key, *args, **kwargs):
+        """Jadwalkan func(*args, **kwargs) sesuai rate limit `api_key` dan `model`; kembalikan Future"""
+        future = Future()
+        with self._cond:
+            if len(self._heap) >= self.max_queue:
+                raise QueueFullError(QUEUE_FULL_MESSAGE)
+            now = time.monotonic()
+            ready_at = self._ready_at(api_key, model, now)
+            heapq.heappush(self._heap, (ready_at, next(self._sequence), future, model, now, func, args, kwargs))
+            self._update_depth()
+            self._start_workers()
+            self._cond.notify()
+        return future
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._heap:
+                        delay = self._heap[0][0] - time.monotonic()
+                        if delay <= 0:
+                            break
+                        self._cond.wait(delay)
+                    else:
+                        self._cond.wait()
+                _, _, future, model, submitted, func, args, kwargs = heapq.heappop(self._heap)
+                self._update_depth()
+                self._running += 1
+            try:
+                # Future yang dibatalkan selagi mengantre dilewati
+                if future.set_running_or_notify_cancel():
+                    observe(AI_QUEUE_WAIT, time.monotonic() - submitted, model=model)
+                    try:
+                        future.set_result(func(*args, **kwargs))
+                    except BaseException as e:
+                        future.set_exception(e)
+            finally:
+                with self._cond:
+                    self._running -= 1
+
+    def position(self, future):
+        """Jumlah permintaan yang gilirannya lebih dulu (0 = sedang/selesai diproses)"""
+        with self._cond:
+            entry = next((e for e in self._heap if e[2] is future), None)
+            if entry is None:
+                return 0
+            return 1 + sum(1 for e in self._heap if e[:2] < entry[:2])
+
+    def stats(self):
+        """Kedalaman antrean, permintaan yang sedang berjalan dan jumlah worker"""
+        with self._cond:
+            return {'antrean': len(self._heap), 'berjalan': self._running, 'workers': self.workers}
+
+    # ====================== PERMINTAAN AI ======================
+    def submit_chat(self, prompt, model, api_key, base_url=None):
+        """get_ai_response lewat antrean; Future berisi teks jawaban atau pesan kesalahan"""
+        from ai_client import ERROR_PREFIX, MISSING_KEY_MESSAGE, get_ai_response
+
+        if not api_key:
+            return _completed(MISSING_KEY_MESSAGE)
+        try:
+            return self.submit(get_ai_response, model, api_key, prompt, model, api_key, base_url)
+        except QueueFullError as e:
+            return _completed(f"{ERROR_PREFIX}: {e}")
+
+    def stream(self, prompt, model, api_key, base_url=None):
+        """stream_ai_response lewat antrean; potongan teks diteruskan dari worker begitu tiba"""
+        from ai_client import ERROR_PREFIX, MISSING_KEY_MESSAGE, stream_ai_response
+
+        if not api_key:
+            yield MISSING_KEY_MESSAGE
+            return
+        chunks = queue.Queue(maxsize=STREAM_BUFFER)
+        cancel = threading.Event()
+
+        def relay(item):
+            """Teruskan ke pembaca; False jika pembaca sudah berhenti"""
+            while not cancel.is_set():
+                try:
+                    chunks.put(item, timeout=RELAY_POLL)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce():
+            response = stream_ai_response(prompt, model, api_key, base_url, cancel=cancel)
+            try:
+                for chunk in response:
+                    if not relay(chunk):
+                        break
+            finally:
+                # Menutup generator juga menutup koneksi HTTP yang masih terbuka
+                response.close()
+                relay(_STREAM_END)
+
+        try:
+            future = self.submit(produce, model, api_key)
+        except QueueFullError as e:
+            yield f"{ERROR_PREFIX}: {e}"
+            return
+        try:
+            while (chunk := chunks.get()) is not _STREAM_END:
+                yield chunk
+        finally:
+            # Pembaca berhenti (misalnya sesi di-rerun): buang dari antrean jika belum
+            # dijalankan, atau putus streaming yang sedang berjalan
+            cancel.set()
+            future.cancel()
+
+def _completed(result):
+    future = Future()
+    future.set_result(result)
+    return future
+
+AI_SCHEDULER = AIScheduler()
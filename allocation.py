@@ -0,0 +1,163 @@
+import numpy as np
+
+from core import DEFAULT_PRIORITY, INFLATION_RATE, RETURN_RATE
+
+MAX_DELAY_YEARS = 50  # batas pencarian tahun tercapai untuk tujuan yang kurang dana
+DELAY_CHUNK_SIZE = 50_000  # jumlah tujuan per potongan saat mencari tahun tercapai
+
+STATUS_FULL = "Terdanai penuh"
+STATUS_PARTIAL = "Terdanai sebagian"
+STATUS_NONE = "Tidak terdanai"
+
+# ====================== ALOKASI SURPLUS ======================
+def _water_fill(groups, demand, supply):
+    """Bagi `supply` per grup ke `demand` secara berurutan (water-filling).
+
+    Array harus sudah terurut per grup lalu per urutan prioritas. Setiap
+    elemen mendapat min(demand, sisa supply setelah elemen sebelumnya di grup
+    yang sama). Jumlah kebutuhan sebelumnya dihitung per peringkat di dalam
+    grup untuk semua grup sekaligus, sehingga penjumlahan tetap dalam skala
+    satu klien dan hasil batch identik dengan perhitungan per klien. Elemen
+    diurutkan sekali menurut (peringkat, grup) lalu tiap peringkat diproses
+    sebagai potongan bersebelahan, jadi total kerja O(n) walaupun satu klien
+    punya sangat banyak tujuan.
+    """
+    n = len(demand)
+    if not n:
+        return np.zeros(0)
+    starts = np.r_[True, groups[1:] != groups[:-1]]
+    group_start = np.maximum.accumulate(np.where(starts, np.arange(n), 0))
+    rank = np.arange(n) - group_start
+    # Input terurut per grup, jadi argsort stabil atas peringkat menghasilkan urutan (peringkat, grup)
+    by_rank = np.argsort(rank, kind='stable')
+    bounds = np.searchsorted(rank[by_rank], np.arange(int(rank.max()) + 2))
+    requested_before = np.zeros(n)
+    for r in range(1, len(bounds) - 1):
+        index = by_rank[bounds[r]:bounds[r + 1]]
+        requested_before[index] = requested_before[index - 1] + demand[index - 1]
+    return np.clip(supply - requested_before, 0.0, demand)
+
+def _years_to_reach(allocation, target, years, return_rate, inflation_rate):
+    """Tahun bulat pertama (>= jangka waktu) saat setoran `allocation` menutup target terinflasi.
+
+    Dicari pada grid tahun jangka_waktu ... jangka_waktu + MAX_DELAY_YEARS per
+    potongan tujuan; NaN jika tidak tercapai dalam batas itu.
+    """
+    r = return_rate / 12
+    result = np.full(len(allocation), np.nan)
+    offsets = np.arange(MAX_DELAY_YEARS + 1)
+    for start in range(0, len(allocation), DELAY_CHUNK_SIZE):
+        chunk = slice(start, start + DELAY_CHUNK_SIZE)
+        grid = years[chunk, None] + offsets
+        months = grid * 12
+        if r > 0:
+            saved = allocation[chunk, None] * ((1 + r) ** months - 1) / r
+        else:
+            saved = allocation[chunk, None] * months
+        reached = saved >= target[chunk, None] * (1 + inflation_rate) ** grid
+        first = reached.argmax(axis=1)
+        result[chunk] = np.where(reached.any(axis=1), grid[np.arange(len(first)), first], np.nan)
+    return result
+
+def _allocate(groups, priority, years, demand, target, supply, return_rate, inflation_rate):
+    """Inti alokasi untuk array tujuan; kembalikan kolom hasil dalam urutan input"""
+    demand = np.nan_to_num(np.asarray(demand, dtype=float), nan=0.0, posinf=0.0)
+    years = np.asarray(years, dtype=float)
+    target = np.asarray(target, dtype=float)
+    supply = np.maximum(np.asarray(supply, dtype=float), 0.0)
+
+    # Urutkan per klien, lalu prioritas (1 = tertinggi), lalu tenggat terdekat
+    order = np.lexsort((np.arange(len(demand)), years, priority, groups))
+    allocation = np.empty_like(demand)
+    allocation[order] = _water_fill(groups[order], demand[order], supply[order])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        funded_pct = np.where(demand > 0, allocation / demand, 1.0)
+    full = funded_pct >= 1 - 1e-9
+    status = np.where(full, STATUS_FULL, np.where(allocation > 0, STATUS_PARTIAL, STATUS_NONE))
+
+    reach_year = years.copy()
+    short = ~full & (allocation > 0)
+    if short.any():
+        reach_year[short] = _years_to_reach(
+            allocation[short], target[short], years[short], return_rate, inflation_rate
+        )
+    reach_year[~full & (allocation <= 0)] = np.nan
+    return {
+        'alokasi_bulanan': allocation,
+        'persen_terdanai': np.minimum(funded_pct, 1.0),
+        'status': status,
+        'tahun_tercapai': reach_year,
+        'terlambat': ~full
+    }
+
+def allocate_goals(goal_projections, surplus, return_rate=RETURN_RATE, inflation_rate=INFLATION_RATE):
+    """Bagi surplus bulanan ke tujuan berdasarkan prioritas lalu tenggat waktu.
+
+    Tujuan dengan prioritas lebih tinggi (angka lebih kecil) dan tenggat lebih
+    dekat dipenuhi lebih dulu sebesar `setoran_bulanan`-nya. Tujuan yang hanya
+    terdanai sebagian atau tidak sama sekali ditandai terlambat, dengan
+    perkiraan tahun tercapai jika setoran yang dialokasikan diteruskan
+    (None jika tidak tercapai dalam MAX_DELAY_YEARS tahun tambahan).
+    """
+    if not goal_projections:
+        return []
+    n = len(goal_projections)
+    result = _allocate(
+        np.zeros(n, dtype=int),
+        np.array([g.get('prioritas', DEFAULT_PRIORITY) for g in goal_projections]),
+        [g['jangka_waktu'] for g in goal_projections],
+        [g['setoran_bulanan'] for g in goal_projections],
+        [g['target_sekarang'] for g in goal_projections],
+        np.full(n, surplus, dtype=float),
+        return_rate, inflation_rate
+    )
+    allocations = []
+    for i, goal in enumerate(goal_projections):
+        reach_year = result['tahun_tercapai'][i]
+        allocations.append({
+            'nama': goal['nama'],
+            'prioritas': goal.get('prioritas', DEFAULT_PRIORITY),
+            'jangka_waktu': goal['jangka_waktu'],
+            'setoran_bulanan': goal['setoran_bulanan'],
+            'alokasi_bulanan': float(result['alokasi_bulanan'][i]),
+            'persen_terdanai': float(result['persen_terdanai'][i]),
+            'status': str(result['status'][i]),
+            'tahun_tercapai': None if np.isnan(reach_year) else int(reach_year),
+            'terlambat': bool(result['terlambat'][i])
+        })
+    return allocations
+
+def allocate_goals_batch(clients, projections, return_rate=RETURN_RATE, inflation_rate=INFLATION_RATE):
+    """Versi batch dari allocate_goals untuk hasil calculate_financials_batch.
+
+    `clients` adalah tabel klien (indeks = client_id) dan `projections` tabel
+    proyeksi tujuan long-form. Surplus tiap klien adalah pendapatan dikurangi
+    pengeluaran. Hasilnya DataFrame dengan indeks yang sama seperti
+    `projections`; `tahun_tercapai` bernilai NaN jika tidak tercapai.
+    """
+    import pandas as pd
+    from batch import _as_frame
+
+    clients = _as_frame(clients)
+    projections = _as_frame(projections)
+    surplus = (
+        clients['pendapatan_tetap'] + clients['pendapatan_variabel']
+        - clients['pengeluaran_wajib'] - clients['pengeluaran_diskresioner']
+    )
+    client_ids = projections['client_id'].to_numpy()
+    if 'prioritas' in projections.columns:
+        priority = projections['prioritas'].fillna(DEFAULT_PRIORITY).to_numpy()
+    else:
+        priority = np.full(len(projections), DEFAULT_PRIORITY)
+    result = _allocate(
+        client_ids,
+        priority,
+        projections['jangka_waktu'].to_numpy(),
+        projections['setoran_bulanan'].to_numpy(),
+        projections['target_sekarang'].to_numpy(),
+        surplus.reindex(client_ids).to_numpy(dtype=float),
+        return_rate, inflation_rate
+    )
+    return pd.DataFrame({'client_id': client_ids, 'nama': projections['nama'].to_numpy(), **result},
+                        index=projections.index)
@@ -0,0 +1,144 @@
+import numpy as np
+
+from core import INFLATION_RATE, RETURN_RATE
+
+# pandas diimpor di dalam fungsi agar modul ini ringan diimpor
+
+CLIENT_COLUMNS = [
+    'pendapatan_tetap', 'pendapatan_variabel',
+    'pengeluaran_wajib', 'pengeluaran_diskresioner',
+    'tabungan', 'investasi', 'properti',
+    'kpr', 'kartu_kredit', 'pinjaman_lain'
+]
+GOAL_COLUMNS = ['client_id', 'nama', 'target', 'tahun']
+
+# ====================== KONVERSI DATA ======================
+def user_data_to_frames(records):
+    """Ubah daftar dict user_data menjadi tabel klien dan tabel tujuan (long-form)"""
+    import pandas as pd
+
+    records = list(records)
+    clients = pd.DataFrame(
+        [{k: v for k, v in r.items() if k not in ('tujuan', 'analysis')} for r in records]
+    )
+    goals = pd.DataFrame(
+        [
+            {'client_id': i, **goal}
+            for i, r in enumerate(records)
+            for goal in r.get('tujuan', [])
+        ],
+        columns=GOAL_COLUMNS + ['prioritas']
+    )
+    return clients, goals
+
+def _as_frame(table):
+    """Terima DataFrame atau dict berisi array NumPy"""
+    import pandas as pd
+
+    if isinstance(table, pd.DataFrame):
+        return table
+    return pd.DataFrame(dict(table))
+
+def _growth_factors(years, rate):
+    """Hitung (1 + rate) ** years per elemen.
+
+    Pangkat dihitung sekali per nilai unik dengan aritmetika float Python,
+    sehingga hasilnya identik bit-per-bit dengan jalur skalar (np.power bisa
+    berbeda 1 ulp dari pow() bawaan).
+    """
+    unique_years, inverse = np.unique(np.asarray(years), return_inverse=True)
+    factors = np.array([(1 + rate) ** y for y in unique_years.tolist()], dtype=float)
+    return factors[inverse.reshape(-1)]
+
+def _round(values, ndigits):
+    """Pembulatan identik dengan round() bawaan.
+
+    np.round mengalikan dengan 10**ndigits lebih dulu, sehingga hasilnya bisa
+    berbeda dari round() (misalnya 0.15) hanya jika hasil kali itu berjarak
+    sekitar 1 ulp dari ,5. Baris seperti itu, yang jarang, dibulatkan ulang
+    dengan round(); baris lain memakai hasil np.round.
+    """
+    values = np.asarray(values, dtype=float)
+    result = np.round(values, ndigits)
+    scaled = values * 10.0 ** ndigits
+    with np.errstate(invalid='ignore'):
+        near_half = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) <= 2 * np.spacing(np.abs(scaled))
+    index = np.flatnonzero(near_half)
+    if index.size:
+        result[index] = [round(v, ndigits) for v in values[index].tolist()]
+    return result
+
+# ====================== PERHITUNGAN VEKTOR ======================
+def future_value_vec(present_value, years, inflation_rate=INFLATION_RATE):
+    """Versi vektor dari calculate_future_value"""
+    return np.asarray(present_value, dtype=float) * _growth_factors(years, inflation_rate)
+
+def monthly_savings_vec(future_value, years, return_rate=RETURN_RATE):
+    """Versi vektor dari calculate_monthly_savings"""
+    n = np.asarray(years) * 12
+    r = return_rate / 12
+    if r == 0:
+        return np.asarray(future_value, dtype=float) / n
+    return (np.asarray(future_value, dtype=float) * r) / (_growth_factors(n, r) - 1)
+
+def calculate_financials_batch(clients, goals=None):
+    """Hitung metrik keuangan dan proyeksi tujuan untuk banyak klien sekaligus.
+
+    `clients` adalah tabel kolom (DataFrame atau dict array) dengan kolom yang
+    sama seperti `user_data`; indeksnya dipakai sebagai `client_id`.
+    `goals` adalah tabel long-form dengan kolom `client_id`, `nama`, `target`
+    dan `tahun`. Hasilnya dua DataFrame: metrik per klien dan proyeksi per
+    tujuan, dengan nilai yang identik dengan `calculate_financials`.
+    Pembagi nol menghasilkan inf/NaN, bukan ZeroDivisionError.
+    """
+    import pandas as pd
+
+    clients = _as_frame(clients)
+    missing = [c for c in CLIENT_COLUMNS if c not in clients.columns]
+    if missing:
+        raise KeyError(f"Kolom klien tidak ditemukan: {', '.join(missing)}")
+
+    col = {c: clients[c].to_numpy() for c in CLIENT_COLUMNS}
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Hitung net worth
+        assets = col['tabungan'] + col['investasi'] + col['properti']
+        liabilities = col['kpr'] + col['kartu_kredit'] + col['pinjaman_lain']
+        net_worth = assets - liabilities
+
+        # Hitung rasio keuangan
+        pendapatan_total = col['pendapatan_tetap'] + col['pendapatan_variabel']
+        pengeluaran_total = col['pengeluaran_wajib'] + col['pengeluaran_diskresioner']
+
+        liquidity_ratio = col['tabungan'] / (pengeluaran_total / 3)  # dalam bulan
+        dti_ratio = liabilities / pendapatan_total
+        savings_rate = (pendapatan_total - pengeluaran_total) / pendapatan_total
+
+    metrics = pd.DataFrame({
+        'net_worth': net_worth,
+        'liquidity_ratio': _round(liquidity_ratio, 1),
+        'dti_ratio': _round(dti_ratio, 2),
+        'savings_rate': savings_rate
+    }, index=clients.index)
+
+    # Proyeksi tujuan keuangan
+    if goals is None:
+        goals = pd.DataFrame(columns=GOAL_COLUMNS)
+    goals = _as_frame(goals)
+    target = goals['target'].to_numpy(dtype=float)
+    years = goals['tahun'].to_numpy()
+    future_value = future_value_vec(target, years) if len(goals) else target
+    monthly_payment = monthly_savings_vec(future_value, years) if len(goals) else target
+
+    projections = pd.DataFrame({
+        'client_id': goals['client_id'].to_numpy(),
+        'nama': goals['nama'].to_numpy(),
+        'target_sekarang': goals['target'].to_numpy(),
+        'target_masa_depan': future_value,
+        'setoran_bulanan': monthly_payment,
+        'jangka_waktu': years
+    }, index=goals.index)
+    if 'prioritas' in goals.columns:
+        projections['prioritas'] = goals['prioritas'].to_numpy()
+
+    return metrics, projections
@@ -0,0 +1,160 @@
+"""Benchmark clean_text_for_pdf: tabel translasi terkompilasi vs implementasi lama.
+
+Jalankan dari root proyek:
+    python benchmarks/bench_clean_text.py
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import clean_text_for_pdf  # noqa: E402
+
+SIZES = [1_000, 100_000, 1_000_000]  # jumlah karakter
+
+def legacy_clean_text_for_pdf(text):
+    """Implementasi lama (str.replace berantai) sebagai pembanding"""
+    # Daftar karakter Unicode yang perlu diganti
+    unicode_replacements = {
+        '💡': '',
+        '⚠️': '',
+        '🔧': '',
+        '📊': '',
+        '→': '->',
+        '←': '<-',
+        '↑': '^',
+        '↓': 'v',
+        '•': '-',
+        '–': '-',
+        '—': '-',
+        '"': '"',
+        '"': '"',
+        ''': "'",
+        ''': "'",
+        '…': '...',
+        '°': ' derajat',
+        '±': '+/-',
+        '×': 'x',
+        '÷': '/',
+        '≤': '<=',
+        '≥': '>=',
+        '≠': '!=',
+        '≈': '~',
+        '∞': 'infinity',
+        '∑': 'sum',
+        '∏': 'product',
+        '√': 'sqrt',
+        '∫': 'integral',
+        '∂': 'partial',
+        '∆': 'delta',
+        '∇': 'nabla',
+        '∈': 'in',
+        '∉': 'not in',
+        '⊂': 'subset',
+        '⊃': 'superset',
+        '∪': 'union',
+        '∩': 'intersection',
+        '∅': 'empty',
+        '∀': 'for all',
+        '∃': 'exists',
+        '∄': 'not exists',
+        '∴': 'therefore',
+        '∵': 'because',
+        '≡': 'equivalent',
+        '≅': 'congruent',
+        '∝': 'proportional',
+        '∞': 'infinity',
+        'α': 'alpha',
+        'β': 'beta',
+        'γ': 'gamma',
+        'δ': 'delta',
+        'ε': 'epsilon',
+        'ζ': 'zeta',
+        'η': 'eta',
+        'θ': 'theta',
+        'ι': 'iota',
+        'κ': 'kappa',
+        'λ': 'lambda',
+        'μ': 'mu',
+        'ν': 'nu',
+        'ξ': 'xi',
+        'ο': 'omicron',
+        'π': 'pi',
+        'ρ': 'rho',
+        'σ': 'sigma',
+        'τ': 'tau',
+        'υ': 'upsilon',
+        'φ': 'phi',
+        'χ': 'chi',
+        'ψ': 'psi',
+        'ω': 'omega',
+        'Α': 'Alpha',
+        'Β': 'Beta',
+        'Γ': 'Gamma',
+        'Δ': 'Delta',
+        'Ε': 'Epsilon',
+        'Ζ': 'Zeta',
+        'Η': 'Eta',
+        'Θ': 'Theta',
+        'Ι': 'Iota',
+        'Κ': 'Kappa',
+        'Λ': 'Lambda',
+        'Μ': 'Mu',
+        'Ν': 'Nu',
+        'Ξ': 'Xi',
+        'Ο': 'Omicron',
+        'Π': 'Pi',
+        'Ρ': 'Rho',
+        'Σ': 'Sigma',
+        'Τ': 'Tau',
+        'Υ': 'Upsilon',
+        'Φ': 'Phi',
+        'Χ': 'Chi',
+        'Ψ': 'Psi',
+        'Ω': 'Omega'
+    }
+    
+    cleaned_text = text
+    for unicode_char, replacement in unicode_replacements.items():
+        cleaned_text = cleaned_text.replace(unicode_char, replacement)
+    
+    # Hapus karakter Unicode lainnya yang tidak dalam daftar
+    cleaned_text = ''.join(char for char in cleaned_text if ord(char) < 256)
+    
+    return cleaned_text
+
+
+PLAIN_WORDS = ["dana", "darurat", "investasi", "reksa", "saham", "obligasi", "tabungan", "pensiun",
+               "Rp", "10.000.000", "bulan", "tahun", "risiko", "alokasi", "-", "(20%)"]
+SPECIAL_WORDS = ["café", "Łukasz", "naïve", "“kutipan”", "‘satu’", "→", "≥", "∞", "α", "Σ", "•",
+                 "💡", "⚠️", "📊", "🔧", "👍🏽", "—", "…", "中文"]
+
+def make_text(n_chars, special_share, seed=0):
+    """Teks sintetis mirip jawaban AI dengan porsi emoji/aksen/simbol tertentu"""
+    rng = random.Random(seed)
+    parts = []
+    size = 0
+    while size < n_chars:
+        word = rng.choice(SPECIAL_WORDS if rng.random() < special_share else PLAIN_WORDS)
+        parts.append(word)
+        size += len(word) + 1
+    return " ".join(parts)[:n_chars]
+
+def bench(func, text, number):
+    """Waktu terbaik per panggilan (detik) dari beberapa ulangan"""
+    return min(timeit.repeat(lambda: func(text), number=number, repeat=5)) / number
+
+def main():
+    print(f"{'teks':>8} {'ukuran':>10} {'lama (ms)':>12} {'baru (ms)':>12} {'speedup':>9}")
+    for label, special_share in [("umum", 0.02), ("padat", 0.5)]:
+        for size in SIZES:
+            text = make_text(size, special_share)
+            number = max(1, 200_000 // size)
+            old = bench(legacy_clean_text_for_pdf, text, number)
+            new = bench(clean_text_for_pdf, text, number)
+            print(f"{label:>8} {size:>10,} {old * 1e3:>12.3f} {new * 1e3:>12.3f} {old / new:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
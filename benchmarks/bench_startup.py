@@ -0,0 +1,130 @@
+"""Benchmark cold start: waktu impor main.py dan waktu render pertama aplikasi.
+
+Setiap pengukuran dijalankan di proses Python baru agar cache impor tidak ikut
+terhitung. Keluar dengan kode 1 jika ambang terlampaui atau modul berat ikut
+terimpor saat start, sehingga regresi dapat ditangkap di CI.
+
+Jalankan dari root proyek:
+    python benchmarks/bench_startup.py --max-import-ms 1500 --max-render-ms 3000
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Paket yang hanya boleh dimuat saat fitur terkait (grafik, PDF, chat AI) dipakai. Submodul
+# yang sudah dimuat oleh streamlit sendiri (misalnya plotly.graph_objects) tidak dihitung.
+DEFERRED_MODULES = ['pandas', 'fpdf', 'requests', 'plotly']
+
+IMPORT_SCRIPT = """
+import json, sys, time
+t = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t
+deferred = {deferred!r}
+print(json.dumps([elapsed, sorted(m for m in sys.modules if m.split('.')[0] in deferred)]))
+"""
+
+RENDER_SCRIPT = """
+import time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("main.py", default_timeout=120)
+t = time.perf_counter()
+at.run()
+first = time.perf_counter() - t
+assert not at.exception, at.exception
+at.session_state.step = 2
+at.session_state.user_data = {user_data!r}
+t = time.perf_counter()
+at.run()
+analysis = time.perf_counter() - t
+assert not at.exception, at.exception
+print([first, analysis])
+"""
+
+SAMPLE_USER_DATA = {
+    'nama': 'Budi', 'usia': 30, 'usia_pensiun': 60, 'status_keluarga': 'Lajang',
+    'pendapatan_tetap': 10_000_000, 'pendapatan_variabel': 2_000_000,
+    'pengeluaran_wajib': 5_000_000, 'pengeluaran_diskresioner': 3_000_000,
+    'tabungan': 5_000_000, 'investasi': 10_000_000, 'properti': 0,
+    'kpr': 0, 'kartu_kredit': 0, 'pinjaman_lain': 0,
+    'tujuan': [
+        {'nama': 'Rumah', 'target': 500_000_000, 'tahun': 10, 'prioritas': 1},
+        {'nama': 'Pendidikan', 'target': 200_000_000, 'tahun': 15, 'prioritas': 2}
+    ],
+    'risk_profile': 3
+}
+
+def _run(script):
+    """Jalankan skrip di proses baru dari root proyek dan urai baris output terakhir sebagai JSON"""
+    result = subprocess.run(
+        [sys.executable, '-c', script], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def measure_import(module, repeat):
+    """Median waktu impor (detik) dan modul dari paket tertunda yang ikut dimuat"""
+    times = []
+    loaded = []
+    for _ in range(repeat):
+        elapsed, loaded = _run(IMPORT_SCRIPT.format(module=module, deferred=DEFERRED_MODULES))
+        times.append(elapsed)
+    return statistics.median(times), loaded
+
+def measure_render(repeat):
+    """Median waktu render pertama (langkah 1) dan render halaman analisis (detik)"""
+    firsts, analyses = [], []
+    for _ in range(repeat):
+        first, analysis = _run(RENDER_SCRIPT.format(user_data=SAMPLE_USER_DATA))
+        firsts.append(first)
+        analyses.append(analysis)
+    return statistics.median(firsts), statistics.median(analyses)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark waktu impor dan render pertama")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--max-import-ms', type=float, default=None)
+    parser.add_argument('--max-render-ms', type=float, default=None)
+    parser.add_argument('--json', action='store_true', help="Cetak hasil sebagai JSON")
+    args = parser.parse_args(argv)
+
+    streamlit_import, streamlit_loaded = measure_import('streamlit', args.repeat)
+    main_import, main_loaded = measure_import('main', args.repeat)
+    # Hanya modul yang dimuat main.py di luar yang sudah dimuat streamlit
+    extra = set(main_loaded) - set(streamlit_loaded)
+    loaded = sorted(m for m in extra if m.rpartition('.')[0] not in extra)
+    first_render, analysis_render = measure_render(args.repeat)
+    results = {
+        'streamlit_import_ms': streamlit_import * 1e3,
+        'main_import_ms': main_import * 1e3,
+        'first_render_ms': first_render * 1e3,
+        'analysis_render_ms': analysis_render * 1e3,
+        'deferred_modules_loaded': loaded
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"Impor streamlit     : {results['streamlit_import_ms']:8.1f} ms")
+        print(f"Impor main.py       : {results['main_import_ms']:8.1f} ms")
+        print(f"Render pertama      : {results['first_render_ms']:8.1f} ms")
+        print(f"Render analisis     : {results['analysis_render_ms']:8.1f} ms")
+        print(f"Modul tertunda dimuat: {', '.join(loaded) or '-'}")
+
+    failures = []
+    if loaded:
+        failures.append(f"modul berat dimuat saat impor: {', '.join(loaded)}")
+    if args.max_import_ms is not None and results['main_import_ms'] > args.max_import_ms:
+        failures.append(f"impor {results['main_import_ms']:.0f} ms > {args.max_import_ms:.0f} ms")
+    if args.max_render_ms is not None and results['first_render_ms'] > args.max_render_ms:
+        failures.append(f"render pertama {results['first_render_ms']:.0f} ms > {args.max_render_ms:.0f} ms")
+    for failure in failures:
+        print(f"REGRESI: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""Suite benchmark jalur panas: perhitungan, proyeksi, rekomendasi, sanitasi teks, grafik dan PDF.
+
+Hasil ditulis sebagai JSON dan dapat dibandingkan dengan baseline tersimpan:
+    python benchmarks/run_benchmarks.py --save benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json --threshold 0.25
+
+Keluar dengan kode 1 jika ada benchmark yang lebih lambat dari baseline
+melebihi ambang (relatif terhadap median).
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from allocation import allocate_goals  # noqa: E402
+from charts import build_goals_figure  # noqa: E402
+from core import calculate_financials, clean_text_for_pdf, generate_pdf_report, generate_recommendations  # noqa: E402
+from debt import simulate_debt_payoff  # noqa: E402
+from projection import project_lifetime  # noqa: E402
+from sensitivity import grid_axes, monthly_savings_grid  # noqa: E402
+from synthetic import SCENARIOS, make_client  # noqa: E402
+
+REPEAT = 5
+MIN_SECONDS = 0.05  # durasi minimum tiap ulangan (menentukan jumlah iterasi)
+
+def _cases(name, user_data):
+    """Fungsi yang diukur untuk satu skenario klien"""
+    analysis = calculate_financials(user_data)
+    if 'ai_text' in user_data:
+        # Teks AI panjang masuk ke laporan sebagai bagian rekomendasi
+        analysis = {**analysis, 'recommendations': analysis['recommendations'] + "\n\n" + user_data['ai_text']}
+    report_data = {**user_data, 'analysis': analysis}
+    text = analysis['recommendations']
+    metrics = (analysis['net_worth'], analysis['dti_ratio'], analysis['savings_rate'])
+    surplus = (user_data['pendapatan_tetap'] + user_data['pendapatan_variabel']
+               - user_data['pengeluaran_wajib'] - user_data['pengeluaran_diskresioner'])
+    return {
+        f"calculate_financials/{name}": lambda: calculate_financials(user_data),
+        f"generate_recommendations/{name}": lambda: generate_recommendations(user_data, *metrics),
+        f"project_lifetime/{name}": lambda: project_lifetime(user_data),
+        f"allocate_goals/{name}": lambda: allocate_goals(analysis['goal_projections'], surplus),
+        f"simulate_debt_payoff/{name}": lambda: simulate_debt_payoff(user_data, max(surplus, 0) / 4),
+        f"monthly_savings_grid/{name}": lambda: monthly_savings_grid(
+            user_data['tujuan'][0]['target'], *grid_axes()
+        ),
+        f"clean_text_for_pdf/{name}": lambda: clean_text_for_pdf(text),
+        f"build_goals_figure/{name}": lambda: build_goals_figure(analysis['goal_projections']),
+        f"generate_pdf_report/{name}": lambda: generate_pdf_report(report_data)
+    }
+
+def measure(func, repeat=REPEAT):
+    """Median dan minimum detik per panggilan"""
+    timer = timeit.Timer(func)
+    number = 1
+    while timer.timeit(number) < MIN_SECONDS and number < 1_000_000:
+        number *= 10
+    runs = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {'median_s': statistics.median(runs), 'min_s': min(runs), 'iterations': number}
+
+def run_suite(selected=None, repeat=REPEAT):
+    """Jalankan semua (atau sebagian, berdasarkan awalan nama) benchmark"""
+    results = {}
+    for scenario, params in SCENARIOS.items():
+        for name, func in _cases(scenario, make_client(seed=1, **params)).items():
+            if selected and not any(name.startswith(prefix) for prefix in selected):
+                continue
+            results[name] = measure(func, repeat)
+            print(f"{name:<45} {results[name]['median_s'] * 1e3:10.3f} ms", file=sys.stderr)
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': repeat
+        },
+        'results': results
+    }
+
+def compare(current, baseline, threshold):
+    """Daftar benchmark yang median-nya naik lebih dari `threshold` (misal 0.25 = 25%)"""
+    regressions = []
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if not base:
+            continue
+        ratio = result['median_s'] / base['median_s']
+        if ratio > 1 + threshold:
+            regressions.append((name, base['median_s'], result['median_s'], ratio))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suite benchmark Financial Planning Advisor")
+    parser.add_argument('--only', nargs='*', help="Awalan nama benchmark yang dijalankan")
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    parser.add_argument('--save', help="Simpan hasil JSON ke file ini")
+    parser.add_argument('--baseline', help="File JSON baseline untuk perbandingan")
+    parser.add_argument('--threshold', type=float, default=0.25, help="Ambang regresi relatif")
+    args = parser.parse_args(argv)
+
+    current = run_suite(args.only, args.repeat)
+    output = json.dumps(current, indent=2)
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        for name, base, now, ratio in regressions:
+            print(f"REGRESI {name}: {base * 1e3:.3f} ms -> {now * 1e3:.3f} ms ({ratio:.2f}x)", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
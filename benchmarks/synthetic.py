@@ -0,0 +1,67 @@
+"""Generator data klien sintetis untuk benchmark."""
+import random
+
+GOAL_NAMES = ["Rumah", "Mobil", "Pendidikan Anak", "Pensiun", "Liburan", "Pernikahan", "Dana Haji", "Usaha"]
+AI_SENTENCES = [
+    "💡 Sisihkan minimal 20% pendapatan setiap bulan sebelum membelanjakan sisanya.",
+    "⚠️ Hindari cicilan konsumtif dengan bunga tinggi seperti kartu kredit — lunasi penuh setiap bulan.",
+    "📊 Diversifikasikan investasi ke reksa dana pasar uang, obligasi dan saham sesuai profil risiko Anda.",
+    "Dana darurat idealnya 6× pengeluaran bulanan dan disimpan di instrumen yang likuid.",
+    "Tinjau kembali “tujuan keuangan” Anda setiap tahun → sesuaikan dengan inflasi ≈ 5%.",
+    "Pertimbangkan asuransi kesehatan & jiwa sebelum menambah porsi investasi berisiko…"
+]
+
+def make_client(n_goals=3, seed=0, ai_text_chars=0):
+    """Satu user_data sintetis dengan `n_goals` tujuan dan (opsional) teks AI panjang"""
+    rng = random.Random(seed)
+    user_data = {
+        'nama': f"Klien Sintetis {seed}",
+        'usia': rng.randint(22, 55),
+        'usia_pensiun': rng.choice([55, 58, 60, 65]),
+        'status_keluarga': rng.choice(["Lajang", "Menikah", "Menikah + Anak"]),
+        'pendapatan_tetap': rng.randrange(5_000_000, 60_000_000, 500_000),
+        'pendapatan_variabel': rng.randrange(0, 10_000_000, 500_000),
+        'pengeluaran_wajib': rng.randrange(2_000_000, 20_000_000, 500_000),
+        'pengeluaran_diskresioner': rng.randrange(500_000, 10_000_000, 500_000),
+        'tabungan': rng.randrange(0, 200_000_000, 1_000_000),
+        'investasi': rng.randrange(0, 500_000_000, 1_000_000),
+        'properti': rng.choice([0, 0, 500_000_000, 1_500_000_000]),
+        'kpr': rng.choice([0, 0, 300_000_000, 900_000_000]),
+        'kartu_kredit': rng.randrange(0, 20_000_000, 500_000),
+        'pinjaman_lain': rng.randrange(0, 50_000_000, 1_000_000),
+        'tujuan': [
+            {
+                'nama': f"{rng.choice(GOAL_NAMES)} {i + 1}",
+                'target': rng.randrange(10_000_000, 2_000_000_000, 10_000_000),
+                'tahun': rng.randint(1, 30),
+                'prioritas': rng.randint(1, 3)
+            }
+            for i in range(n_goals)
+        ],
+        'risk_profile': rng.randint(1, 5)
+    }
+    if ai_text_chars:
+        user_data['ai_text'] = make_ai_text(ai_text_chars, seed)
+    return user_data
+
+def make_ai_text(n_chars, seed=0):
+    """Teks mirip jawaban AI (emoji, tanda kutip, simbol) sepanjang `n_chars` karakter"""
+    rng = random.Random(seed)
+    parts = []
+    size = 0
+    while size < n_chars:
+        sentence = rng.choice(AI_SENTENCES)
+        parts.append(sentence)
+        size += len(sentence) + 1
+    return " ".join(parts)[:n_chars]
+
+def make_clients(count, n_goals=3, seed=0):
+    """Daftar `count` klien sintetis dengan seed berurutan"""
+    return [make_client(n_goals, seed + i) for i in range(count)]
+
+# Skenario ukuran yang dipakai suite benchmark
+SCENARIOS = {
+    'sedikit_tujuan': {'n_goals': 1},
+    'banyak_tujuan': {'n_goals': 50},
+    'teks_ai_panjang': {'n_goals': 3, 'ai_text_chars': 20_000}
+}
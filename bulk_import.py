@@ -0,0 +1,325 @@
+"""Impor massal profil klien dari CSV/Parquet dengan analisis per potongan.
+
+Klien dibaca per potongan (satu baris per klien) bersama tabel tujuan long-form
+(satu baris per tujuan, jumlah tujuan per klien bebas). Kedua file harus
+terurut naik berdasarkan `client_id` (bilangan bulat), sehingga tujuan dapat
+digabungkan secara streaming tanpa memuat seluruh file. Baris yang tidak valid
+dicatat ke file penolakan, bukan menghentikan proses.
+
+Contoh CLI:
+    python bulk_import.py klien.csv --goals tujuan.csv -o hasil.parquet \\
+        --goals-output proyeksi.parquet --rejects ditolak.csv --chunk-size 50000
+
+Format dipilih dari ekstensi file (.csv atau .parquet). Parquet memerlukan pyarrow.
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from allocation import allocate_goals_batch
+from batch import CLIENT_COLUMNS, calculate_financials_batch
+from core import DEBT_RATES, DEFAULT_PRIORITY
+from recommendations import RULES
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+# Batas nilai per kolom (min, max); None = tanpa batas. Sama dengan batas di form input.
+CLIENT_RULES = {
+    **{column: (0, None) for column in CLIENT_COLUMNS},
+    'usia': (18, 100),
+    'usia_pensiun': (40, 80),
+    'risk_profile': (1, 5)
+}
+OPTIONAL_CLIENT_RULES = {
+    **{f'bunga_{name}': (0, 1) for name in DEBT_RATES},
+    **{f'cicilan_{name}': (0, None) for name in DEBT_RATES}
+}
+GOAL_RULES = {
+    'target': (0, None),
+    'tahun': (1, 100),
+    'prioritas': (1, 3)
+}
+METRIC_COLUMNS = ['net_worth', 'liquidity_ratio', 'dti_ratio', 'savings_rate']
+RULE_PREFIX = 'aturan_'  # kolom boolean hasil per aturan rekomendasi
+
+# ====================== BACA & TULIS ======================
+def _require_pyarrow():
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Format Parquet memerlukan pyarrow: pip install pyarrow") from None
+    return pq
+
+def _is_parquet(path):
+    return path.lower().endswith('.parquet')
+
+def iter_table(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Baca CSV atau Parquet sebagai rangkaian DataFrame berukuran maksimal `chunk_size`"""
+    if _is_parquet(path):
+        pq = _require_pyarrow()
+        for record_batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield record_batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+class TableWriter:
+    """Tulis DataFrame per potongan ke satu file CSV atau Parquet"""
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self._parquet = _is_parquet(path)
+        self._writer = None
+        self._started = False
+
+    def write(self, frame):
+        if self._parquet:
+            import pyarrow as pa
+            pq = _require_pyarrow()
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            else:
+                # Samakan tipe dengan potongan pertama (misalnya kolom yang seluruhnya kosong)
+                table = table.cast(self._writer.schema)
+            self._writer.write_table(table)
+        else:
+            frame.to_csv(self.path, mode='a' if self._started else 'w', header=not self._started, index=False)
+        self._started = True
+        self.rows += len(frame)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+# ====================== VALIDASI ======================
+def _check_columns(frame, required, label):
+    missing = [c for c in required if c not in frame.columns]
+    if missing:
+        raise ValueError(f"Kolom {label} tidak ditemukan: {', '.join(missing)}")
+
+def _validate(frame, rules, required):
+    """Ubah kolom aturan menjadi numerik dan kembalikan alasan penolakan per baris ('' = valid)"""
+    reasons = pd.Series('', index=frame.index, dtype=object)
+    for column, (low, high) in rules.items():
+        if column not in frame.columns:
+            continue
+        values = pd.to_numeric(frame[column], errors='coerce')
+        frame[column] = values
+        invalid = values.isna() if column in required else pd.Series(False, index=frame.index)
+        if low is not None:
+            invalid |= values < low
+        if high is not None:
+            invalid |= values > high
+        reasons[invalid.to_numpy()] += f"{column} tidak valid; "
+    return reasons
+
+def validate_clients(frame):
+    """Pisahkan potongan klien menjadi baris valid dan baris ditolak (dengan alasan)"""
+    _check_columns(frame, ['client_id', *CLIENT_RULES], "klien")
+    frame = frame.copy()
+    reasons = _validate(frame, {**CLIENT_RULES, **OPTIONAL_CLIENT_RULES}, CLIENT_RULES)
+    # Pembagi nol di rasio keuangan
+    reasons[(frame['pendapatan_tetap'] + frame['pendapatan_variabel'] <= 0).to_numpy()] += "pendapatan total 0; "
+    reasons[(frame['pengeluaran_wajib'] + frame['pengeluaran_diskresioner'] <= 0).to_numpy()] += "pengeluaran total 0; "
+    valid = reasons == ''
+    rejected = pd.DataFrame({'tabel': 'klien', 'client_id': frame['client_id'], 'alasan': reasons.str.rstrip('; ')})
+    return frame[valid.to_numpy()], rejected[~valid.to_numpy()]
+
+def validate_goals(frame, client_ids):
+    """Pisahkan tujuan menjadi baris valid dan ditolak; tujuan harus milik klien yang valid"""
+    frame = frame.copy()
+    if 'prioritas' not in frame.columns:
+        frame['prioritas'] = DEFAULT_PRIORITY
+    frame['prioritas'] = frame['prioritas'].fillna(DEFAULT_PRIORITY)
+    reasons = _validate(frame, GOAL_RULES, GOAL_RULES)
+    reasons[(frame['tahun'] % 1 != 0).to_numpy()] += "tahun harus bilangan bulat; "
+    reasons[frame['nama'].isna().to_numpy()] += "nama tujuan kosong; "
+    reasons[~frame['client_id'].isin(client_ids).to_numpy()] += "klien tidak ditemukan atau ditolak; "
+    valid = reasons == ''
+    rejected = pd.DataFrame({'tabel': 'tujuan', 'client_id': frame['client_id'], 'alasan': reasons.str.rstrip('; ')})
+    return frame[valid.to_numpy()], rejected[~valid.to_numpy()]
+
+# ====================== PENGGABUNGAN STREAMING ======================
+def _sorted_ids(frame, label, previous_last, strict):
+    """Validasi client_id bilangan bulat dan terurut naik (juga terhadap potongan sebelumnya)"""
+    ids = pd.to_numeric(frame['client_id'], errors='coerce')
+    if ids.isna().any() or (ids % 1 != 0).any():
+        raise ValueError(f"client_id {label} harus bilangan bulat")
+    ids = ids.astype('int64').to_numpy()
+    steps = np.diff(ids, prepend=previous_last if previous_last is not None else ids[:1] - 1)
+    if (steps <= 0).any() if strict else (steps < 0).any():
+        raise ValueError(f"File {label} harus terurut naik berdasarkan client_id")
+    frame['client_id'] = ids
+    return frame
+
+class _GoalStream:
+    """Ambil tujuan dari stream terurut sampai client_id tertentu; sisanya ditahan untuk potongan berikutnya"""
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = None
+        self._last_id = None
+
+    def take_until(self, max_id):
+        parts = []
+        while True:
+            if self._buffer is not None and len(self._buffer):
+                cut = int(np.searchsorted(self._buffer['client_id'].to_numpy(), max_id, side='right'))
+                parts.append(self._buffer.iloc[:cut])
+                self._buffer = self._buffer.iloc[cut:]
+                if len(self._buffer):
+                    break
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            _check_columns(chunk, ['client_id', 'nama', 'target', 'tahun'], "tujuan")
+            self._buffer = _sorted_ids(chunk.copy(), "tujuan", self._last_id, strict=False)
+            if len(self._buffer):
+                self._last_id = int(self._buffer['client_id'].iloc[-1])
+        return pd.concat(parts, ignore_index=True) if parts else None
+
+    def remaining(self):
+        """Tujuan yang tersisa setelah klien terakhir (tidak punya pasangan klien)"""
+        if self._buffer is not None and len(self._buffer):
+            yield self._buffer
+        yield from self._chunks
+
+# ====================== PIPELINE ======================
+def analyze_chunk(clients, goals):
+    """Analisis satu potongan klien valid; kembalikan (hasil per klien, hasil per tujuan)"""
+    clients = clients.set_index('client_id', drop=False)
+    metrics, projections = calculate_financials_batch(clients, goals)
+    surplus = (
+        clients['pendapatan_tetap'] + clients['pendapatan_variabel']
+        - clients['pengeluaran_wajib'] - clients['pengeluaran_diskresioner']
+    )
+    client_results = pd.DataFrame({
+        'client_id': clients['client_id'].to_numpy(),
+        'nama': clients['nama'].to_numpy() if 'nama' in clients.columns else None,
+        **{column: metrics[column].to_numpy() for column in METRIC_COLUMNS},
+        'surplus_bulanan': surplus.to_numpy()
+    })
+    hits = RULES.evaluate_batch(clients)
+    for rule_id in hits.columns:
+        client_results[f'{RULE_PREFIX}{rule_id}'] = hits[rule_id].to_numpy()
+    if not len(projections):
+        client_results['jumlah_tujuan'] = 0
+        client_results['tujuan_terlambat'] = 0
+        return client_results, projections
+
+    allocation = allocate_goals_batch(clients, projections)
+    goal_results = pd.concat(
+        [projections, allocation.drop(columns=['client_id', 'nama'])], axis=1
+    ).reset_index(drop=True)
+    per_client = goal_results.groupby('client_id').agg(
+        jumlah_tujuan=('nama', 'size'), tujuan_terlambat=('terlambat', 'sum')
+    )
+    counts = per_client.reindex(client_results['client_id']).fillna(0).astype('int64')
+    client_results['jumlah_tujuan'] = counts['jumlah_tujuan'].to_numpy()
+    client_results['tujuan_terlambat'] = counts['tujuan_terlambat'].to_numpy()
+    return client_results, goal_results
+
+def import_clients(clients_path, output, goals_path=None, goals_output=None, rejects_output=None,
+                   chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """Impor, validasi dan analisis file klien per potongan lalu tulis hasilnya.
+
+    Memori dibatasi oleh `chunk_size` (klien per potongan, dan baris tujuan per
+    potongan baca) berapa pun ukuran file. `progress(clients_done, elapsed)`
+    dipanggil setiap potongan selesai. Mengembalikan statistik jumlah baris.
+    """
+    writers = {'clients': TableWriter(output)}
+    if goals_output:
+        writers['goals'] = TableWriter(goals_output)
+    if rejects_output:
+        writers['rejects'] = TableWriter(rejects_output)
+    goal_stream = _GoalStream(iter_table(goals_path, chunk_size) if goals_path else ())
+    stats = {
+        'clients': 0, 'goals': 0, 'rejected_clients': 0, 'rejected_goals': 0,
+        'rule_hits': dict.fromkeys(RULES.rule_ids, 0)
+    }
+    start = time.perf_counter()
+    last_id = None
+
+    def reject(rows, key):
+        stats[key] += len(rows)
+        if len(rows) and 'rejects' in writers:
+            writers['rejects'].write(rows)
+
+    try:
+        for chunk in iter_table(clients_path, chunk_size):
+            if not len(chunk):
+                continue
+            _check_columns(chunk, ['client_id'], "klien")
+            chunk = _sorted_ids(chunk.copy(), "klien", last_id, strict=True)
+            last_id = int(chunk['client_id'].iloc[-1])
+
+            clients, rejected_clients = validate_clients(chunk)
+            reject(rejected_clients, 'rejected_clients')
+            goals = goal_stream.take_until(last_id)
+            if goals is not None:
+                goals, rejected_goals = validate_goals(goals, clients['client_id'])
+                reject(rejected_goals, 'rejected_goals')
+
+            client_results, goal_results = analyze_chunk(clients, goals)
+            writers['clients'].write(client_results)
+            if 'goals' in writers and len(goal_results):
+                writers['goals'].write(goal_results)
+            stats['clients'] += len(client_results)
+            stats['goals'] += len(goal_results)
+            for rule_id in stats['rule_hits']:
+                stats['rule_hits'][rule_id] += int(client_results[f'{RULE_PREFIX}{rule_id}'].sum())
+            if progress:
+                progress(stats['clients'], time.perf_counter() - start)
+
+        # Tujuan dengan client_id setelah klien terakhir
+        for leftover in goal_stream.remaining():
+            reject(pd.DataFrame({
+                'tabel': 'tujuan', 'client_id': leftover['client_id'], 'alasan': "klien tidak ditemukan atau ditolak"
+            }), 'rejected_goals')
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    elapsed = time.perf_counter() - start
+    stats['seconds'] = elapsed
+    stats['clients_per_second'] = stats['clients'] / elapsed if elapsed > 0 else 0.0
+    return stats
+
+# ====================== CLI ======================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Impor dan analisis massal profil klien dari CSV/Parquet")
+    parser.add_argument('clients', help="File klien .csv/.parquet (satu baris per klien, terurut client_id)")
+    parser.add_argument('--goals', help="File tujuan long-form .csv/.parquet (client_id, nama, target, tahun, prioritas)")
+    parser.add_argument('-o', '--output', required=True, help="File hasil per klien (.csv/.parquet)")
+    parser.add_argument('--goals-output', help="File hasil proyeksi & alokasi per tujuan (.csv/.parquet)")
+    parser.add_argument('--rejects', help="File baris yang ditolak beserta alasannya (.csv/.parquet)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Jumlah baris per potongan")
+    args = parser.parse_args(argv)
+
+    def report_progress(done, elapsed):
+        print(f"{done} klien - {done / elapsed:,.0f} klien/detik", file=sys.stderr)
+
+    try:
+        stats = import_clients(
+            args.clients, args.output, args.goals, args.goals_output, args.rejects,
+            args.chunk_size, report_progress
+        )
+    except (ValueError, ImportError) as e:
+        print(f"Gagal: {e}", file=sys.stderr)
+        return 2
+    print(
+        f"Selesai: {stats['clients']} klien, {stats['goals']} tujuan dalam {stats['seconds']:.1f} detik "
+        f"({stats['clients_per_second']:,.0f} klien/detik); ditolak {stats['rejected_clients']} klien, "
+        f"{stats['rejected_goals']} tujuan",
+        file=sys.stderr
+    )
+    print(
+        "Aturan rekomendasi: " + ", ".join(f"{rule_id} {hits}" for rule_id, hits in stats['rule_hits'].items()),
+        file=sys.stderr
+    )
+    return 1 if stats['rejected_clients'] or stats['rejected_goals'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""Pembuatan laporan PDF massal untuk banyak klien.
+
+Contoh CLI:
+    python bulk_reports.py klien.jsonl -o laporan.zip --workers 4
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from core import generate_pdf_report, with_analysis
+
+# Jumlah tugas yang boleh menunggu per worker; membatasi memori berapa pun jumlah klien
+IN_FLIGHT_PER_WORKER = 4
+
+# ====================== WORKER ======================
+def _render_report(index, user_data):
+    """Hitung analisis (jika belum ada) dan render PDF satu klien; dijalankan di proses worker"""
+    user_data = with_analysis(user_data)
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', user_data.get('nama') or 'klien').strip('_') or 'klien'
+    return f"{index:06d}_{slug}.pdf", generate_pdf_report(user_data)
+
+# ====================== OUTPUT ======================
+class _ZipSink:
+    """Tulis setiap PDF langsung ke arsip ZIP"""
+    def __init__(self, path):
+        # PDF dari FPDF sudah terkompresi, jadi disimpan tanpa kompresi ulang
+        self._zip = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_STORED)
+
+    def write(self, name, data):
+        self._zip.writestr(name, data)
+
+    def close(self):
+        self._zip.close()
+
+class _DirectorySink:
+    """Tulis setiap PDF sebagai file di direktori"""
+    def __init__(self, path):
+        self._path = path
+        os.makedirs(path, exist_ok=True)
+
+    def write(self, name, data):
+        with open(os.path.join(self._path, name), 'wb') as f:
+            f.write(data)
+
+    def close(self):
+        pass
+
+def _open_sink(output):
+    return _ZipSink(output) if output.lower().endswith('.zip') else _DirectorySink(output)
+
+# ====================== PIPELINE ======================
+def generate_reports_bulk(records, output, workers=None, progress=None):
+    """Render laporan PDF untuk banyak klien secara paralel ke ZIP atau direktori.
+
+    `records` boleh berupa iterator (misalnya dibaca baris per baris); hanya
+    sejumlah kecil tugas yang ditahan di memori sekaligus. PDF ditulis ke
+    `output` begitu selesai (urutan selesai, bukan urutan input).
+    `progress(done, elapsed)` dipanggil setiap kali satu laporan selesai.
+    Klien yang gagal dirender dicatat di `failed` tanpa menghentikan proses.
+    Mengembalikan statistik jumlah laporan, total byte, durasi dan throughput.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * IN_FLIGHT_PER_WORKER
+    sink = _open_sink(output)
+    done = 0
+    total_bytes = 0
+    failed = []
+    start = time.perf_counter()
+
+    def collect(finished):
+        nonlocal done, total_bytes
+        for future in finished:
+            index = pending.pop(future)
+            try:
+                name, data = future.result()
+            except Exception as e:
+                failed.append((index, str(e)))
+                continue
+            sink.write(name, data)
+            done += 1
+            total_bytes += len(data)
+            if progress:
+                progress(done, time.perf_counter() - start)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = {}
+            for index, user_data in enumerate(records, start=1):
+                if len(pending) >= max_in_flight:
+                    collect(wait(pending, return_when=FIRST_COMPLETED).done)
+                pending[pool.submit(_render_report, index, user_data)] = index
+            collect(wait(pending).done)
+    finally:
+        sink.close()
+
+    elapsed = time.perf_counter() - start
+    return {
+        'reports': done,
+        'failed': failed,
+        'bytes': total_bytes,
+        'seconds': elapsed,
+        'reports_per_second': done / elapsed if elapsed > 0 else 0.0
+    }
+
+def read_records(path):
+    """Baca data klien dari file JSON Lines (dialirkan per baris) atau array JSON"""
+    if path.lower().endswith('.jsonl'):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with open(path, encoding='utf-8') as f:
+            yield from json.load(f)
+
+# ====================== CLI ======================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Buat laporan PDF massal dari data klien")
+    parser.add_argument('input', help="File .jsonl (satu user_data per baris) atau .json (array)")
+    parser.add_argument('-o', '--output', required=True, help="File .zip atau direktori tujuan")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="Jumlah proses worker")
+    parser.add_argument('--every', type=int, default=100, help="Tampilkan progres setiap N laporan")
+    args = parser.parse_args(argv)
+
+    def report_progress(done, elapsed):
+        if done % args.every == 0:
+            print(f"{done} laporan - {done / elapsed:.1f} laporan/detik", file=sys.stderr)
+
+    stats = generate_reports_bulk(read_records(args.input), args.output, args.workers, report_progress)
+    print(
+        f"Selesai: {stats['reports']} laporan, {stats['bytes'] / 1e6:.1f} MB "
+        f"dalam {stats['seconds']:.1f} detik ({stats['reports_per_second']:.1f} laporan/detik)",
+        file=sys.stderr
+    )
+    for index, error in stats['failed']:
+        print(f"Gagal: klien #{index}: {error}", file=sys.stderr)
+    return 1 if stats['failed'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
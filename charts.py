@@ -0,0 +1,149 @@
+import plotly.graph_objects as go
+
+# ====================== FUNGSI VISUALISASI ======================
+def build_goals_figure(goals):
+    """Buat visualisasi tujuan keuangan menggunakan Plotly"""
+    goal_names = [g['nama'] for g in goals]
+    current_targets = [g['target_sekarang'] / 1e6 for g in goals]
+    future_targets = [g['target_masa_depan'] / 1e6 for g in goals]
+    
+    # Buat figure dengan Plotly
+    fig = go.Figure()
+    
+    # Tambahkan bar untuk target sekarang
+    fig.add_trace(go.Bar(
+        name='Target Sekarang',
+        x=goal_names,
+        y=current_targets,
+        marker_color='#6a11cb'
+    ))
+    
+    # Tambahkan bar untuk target masa depan
+    fig.add_trace(go.Bar(
+        name='Target Masa Depan',
+        x=goal_names,
+        y=future_targets,
+        marker_color='#2575fc'
+    ))
+    
+    # Update layout
+    fig.update_layout(
+        title='Perbandingan Target Keuangan',
+        xaxis_title='Tujuan Keuangan',
+        yaxis_title='Juta IDR',
+        barmode='group',
+        height=500,
+        showlegend=True,
+        plot_bgcolor='white',
+        paper_bgcolor='white'
+    )
+    
+    # Update axes
+    fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='lightgray')
+    fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='lightgray')
+    
+    return fig
+
+def build_projection_figure(projection):
+    """Buat grafik proyeksi kekayaan bulanan seumur hidup"""
+    ages = projection['usia']
+    fig = go.Figure()
+    
+    # Satu garis per komponen kekayaan (dalam juta IDR)
+    for key, label, color in (
+        ('net_worth', 'Net Worth', '#6a11cb'),
+        ('aset_likuid', 'Aset Likuid', '#2575fc'),
+        ('utang', 'Sisa Utang', '#e74c3c')
+    ):
+        fig.add_trace(go.Scatter(
+            name=label,
+            x=ages,
+            y=projection[key] / 1e6,
+            mode='lines',
+            line=dict(color=color, width=2)
+        ))
+    
+    # Tandai awal fase pensiun
+    fig.add_vline(
+        x=projection['usia_pensiun'],
+        line_dash='dash',
+        line_color='gray',
+        annotation_text='Pensiun'
+    )
+    
+    fig.update_layout(
+        title='Proyeksi Kekayaan Bulanan',
+        xaxis_title='Usia',
+        yaxis_title='Juta IDR',
+        height=500,
+        showlegend=True,
+        hovermode='x unified',
+        plot_bgcolor='white',
+        paper_bgcolor='white'
+    )
+    fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='lightgray')
+    fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='lightgray')
+    
+    return fig
+
+def build_sensitivity_figure(grid, horizon_index, assumptions=None):
+    """Buat heatmap setoran bulanan (juta IDR) per kombinasi inflasi dan return"""
+    fig = go.Figure(go.Heatmap(
+        x=grid['return'] * 100,
+        y=grid['inflasi'] * 100,
+        z=grid['setoran_bulanan'][:, :, horizon_index] / 1e6,
+        colorscale='Viridis',
+        colorbar=dict(title='Juta IDR'),
+        hovertemplate='Return %{x:.1f}%<br>Inflasi %{y:.1f}%<br>Setoran Rp %{z:,.2f} juta<extra></extra>'
+    ))
+    
+    # Tandai asumsi yang dipakai di analisis utama
+    if assumptions is not None:
+        inflation, annual_return = assumptions
+        fig.add_trace(go.Scatter(
+            x=[annual_return * 100],
+            y=[inflation * 100],
+            mode='markers',
+            marker=dict(color='white', size=12, symbol='x', line=dict(color='black', width=1)),
+            name='Asumsi saat ini',
+            hoverinfo='skip'
+        ))
+    
+    fig.update_layout(
+        title=f"Setoran Bulanan untuk Jangka Waktu {int(grid['tahun'][horizon_index])} Tahun",
+        xaxis_title='Return Investasi (% p.a.)',
+        yaxis_title='Inflasi (% p.a.)',
+        height=500,
+        showlegend=False,
+        plot_bgcolor='white',
+        paper_bgcolor='white'
+    )
+    
+    return fig
+
+def build_debt_payoff_figure(balances, labels):
+    """Buat grafik sisa utang per bulan untuk setiap strategi pelunasan"""
+    fig = go.Figure()
+    
+    for strategy, series in balances.items():
+        fig.add_trace(go.Scatter(
+            name=labels[strategy],
+            x=list(range(len(series))),
+            y=series / 1e6,
+            mode='lines'
+        ))
+    
+    fig.update_layout(
+        title='Sisa Utang per Strategi',
+        xaxis_title='Bulan',
+        yaxis_title='Juta IDR',
+        height=450,
+        showlegend=True,
+        hovermode='x unified',
+        plot_bgcolor='white',
+        paper_bgcolor='white'
+    )
+    fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='lightgray')
+    fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='lightgray')
+    
+    return fig
@@ -0,0 +1,107 @@
+import hashlib
+import os
+import re
+import secrets
+import sqlite3
+import time
+import unicodedata
+
+DEFAULT_PATH = os.environ.get("FPA_CHAT_DB_PATH", os.path.join(".cache", "chat_history.sqlite3"))
+DEFAULT_MAX_MESSAGES = 1000  # pesan tersimpan per klien; yang terlama dibuang
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    client_id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_messages_client ON messages (client_id, id);
+"""
+
+# ====================== RIWAYAT CHAT ======================
+def session_token(value=None):
+    """Token sesi acak yang tidak bisa ditebak; `value` dipakai ulang jika formatnya valid"""
+    if value and re.fullmatch(r"[0-9a-f]{32}", value):
+        return value
+    return secrets.token_hex(16)
+
+def client_key(user_data, token):
+    """Kunci riwayat dari token sesi dan nama klien ternormalisasi.
+
+    Nama saja tidak cukup: sesi lain yang mengetik nama yang sama tidak boleh
+    membaca riwayat ini. Nama hanya memisahkan klien di dalam satu sesi.
+    """
+    name = " ".join(unicodedata.normalize("NFKC", user_data.get('nama') or "").casefold().split())
+    return hashlib.sha256(f"{token}\0{name}".encode("utf-8")).hexdigest()
+
+class ChatStore:
+    """Riwayat chat per klien berbasis SQLite dengan jumlah pesan terbatas.
+
+    Pesan dibaca per halaman dari yang terbaru (keyset pagination pada id),
+    sehingga biaya membaca tidak bergantung pada panjang percakapan. Seperti
+    LLMResponseCache, setiap operasi membuka koneksi sendiri (mode WAL).
+    """
+    def __init__(self, path=DEFAULT_PATH, max_messages=DEFAULT_MAX_MESSAGES):
+        self.path = path
+        self.max_messages = max_messages
+        self._initialized = False
+
+    def _connect(self):
+        if not self._initialized:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout = 10000")
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.executescript(_SCHEMA)
+            self._initialized = True
+        return conn
+
+    def append(self, client_id, role, content):
+        """Simpan satu pesan, buang pesan terlama di atas batas; kembalikan pesan dengan id"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            message_id = conn.execute(
+                "INSERT INTO messages (client_id, role, content, created_at) VALUES (?, ?, ?, ?)",
+                (client_id, role, content, time.time())
+            ).lastrowid
+            conn.execute(
+                "DELETE FROM messages WHERE client_id = ? AND id <= ("
+                "SELECT id FROM messages WHERE client_id = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                (client_id, client_id, self.max_messages)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return {"id": message_id, "role": role, "content": content}
+
+    def recent(self, client_id, limit, before_id=None):
+        """Maksimal `limit` pesan terbaru (sebelum `before_id` jika diisi), urut dari terlama"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT id, role, content FROM messages WHERE client_id = ? AND id < ? "
+                "ORDER BY id DESC LIMIT ?",
+                (client_id, before_id if before_id is not None else 2 ** 63 - 1, limit)
+            ).fetchall()
+        finally:
+            conn.close()
+        return [{"id": i, "role": role, "content": content} for i, role, content in reversed(rows)]
+
+    def clear(self, client_id):
+        """Hapus seluruh riwayat satu klien"""
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM messages WHERE client_id = ?", (client_id,))
+        finally:
+            conn.close()
+
+CHAT_STORE = ChatStore()
@@ -0,0 +1,216 @@
+"""Inti perhitungan keuangan dan laporan PDF tanpa ketergantungan UI.
+
+Modul ini aman diimpor oleh layanan lain, worker proses dan skrip batch
+karena tidak memuat Streamlit. fpdf baru dimuat saat laporan dibuat.
+"""
+import unicodedata
+from functools import lru_cache
+
+from metrics import PDF_BYTES, observe, timed
+
+INFLATION_RATE = 0.05  # asumsi inflasi 5%
+RETURN_RATE = 0.1  # asumsi return 10% p.a.
+DEFAULT_PRIORITY = 1  # prioritas tujuan jika tidak diisi (1 = tertinggi)
+
+# Jenis utang di user_data dan asumsi bunga tahunannya jika bunga_<utang> tidak diisi
+DEBT_RATES = {
+    'kpr': 0.08,
+    'kartu_kredit': 0.24,
+    'pinjaman_lain': 0.12
+}
+DEBT_LABELS = {'kpr': "KPR", 'kartu_kredit': "Kartu Kredit", 'pinjaman_lain': "Pinjaman Lain"}
+
+# ====================== FUNGSI PERHITUNGAN KEUANGAN ======================
+def calculate_future_value(present_value, years, inflation_rate):
+    """Hitung nilai masa depan dengan penyesuaian inflasi"""
+    return present_value * (1 + inflation_rate) ** years
+
+def calculate_monthly_savings(future_value, years, return_rate):
+    """Hitung setoran bulanan yang diperlukan"""
+    n = years * 12
+    r = return_rate / 12
+    if r == 0:
+        # Tanpa return, target cukup dibagi rata ke seluruh bulan
+        return future_value / n
+    return (future_value * r) / ((1 + r) ** n - 1)
+
+@timed('calculate_financials')
+def calculate_financials(user_data):
+    """Lakukan semua perhitungan keuangan"""
+    # Hitung net worth
+    assets = user_data['tabungan'] + user_data['investasi'] + user_data['properti']
+    liabilities = user_data['kpr'] + user_data['kartu_kredit'] + user_data['pinjaman_lain']
+    net_worth = assets - liabilities
+    
+    # Hitung rasio keuangan
+    pendapatan_total = user_data['pendapatan_tetap'] + user_data['pendapatan_variabel']
+    pengeluaran_total = user_data['pengeluaran_wajib'] + user_data['pengeluaran_diskresioner']
+    
+    liquidity_ratio = user_data['tabungan'] / (pengeluaran_total / 3)  # dalam bulan
+    dti_ratio = (user_data['kpr'] + user_data['kartu_kredit'] + user_data['pinjaman_lain']) / pendapatan_total
+    savings_rate = (pendapatan_total - pengeluaran_total) / pendapatan_total
+    
+    # Proyeksi tujuan keuangan
+    goal_projections = []
+    for goal in user_data['tujuan']:
+        future_value = calculate_future_value(
+            goal['target'], 
+            years=goal['tahun'], 
+            inflation_rate=INFLATION_RATE  # asumsi inflasi 5%
+        )
+        monthly_payment = calculate_monthly_savings(
+            future_value, 
+            years=goal['tahun'], 
+            return_rate=RETURN_RATE  # asumsi return 10% p.a.
+        )
+        goal_projections.append({
+            'nama': goal['nama'],
+            'target_sekarang': goal['target'],
+            'target_masa_depan': future_value,
+            'setoran_bulanan': monthly_payment,
+            'jangka_waktu': goal['tahun'],
+            'prioritas': goal.get('prioritas', DEFAULT_PRIORITY)
+        })
+    
+    # Rekomendasi AI sederhana
+    recommendations = generate_recommendations(user_data, net_worth, dti_ratio, savings_rate)
+    
+    return {
+        'net_worth': net_worth,
+        'liquidity_ratio': round(liquidity_ratio, 1),
+        'dti_ratio': round(dti_ratio, 2),
+        'savings_rate': savings_rate,
+        'goal_projections': goal_projections,
+        'recommendations': recommendations
+    }
+
+def generate_recommendations(user_data, net_worth, dti, savings_rate):
+    """Buat rekomendasi keuangan dari aturan di recommendation_rules.json"""
+    # Mesin aturan (NumPy) dimuat saat analisis pertama, bukan saat impor
+    from recommendations import RULES
+    return RULES.recommend(user_data, net_worth, dti, savings_rate)
+
+def with_analysis(user_data):
+    """Kembalikan user_data yang dilengkapi hasil analisis jika belum ada"""
+    if 'analysis' in user_data:
+        return user_data
+    return {**user_data, 'analysis': calculate_financials(user_data)}
+
+# ====================== FUNGSI LAPORAN PDF ======================
+# Karakter pengganti untuk teks PDF (FPDF hanya mendukung latin-1)
+PDF_CHAR_REPLACEMENTS = {
+    # Emoji yang dipakai di rekomendasi; '⚠️' = '⚠' + variation selector
+    '💡': '', '⚠': '', '🔧': '', '📊': '',
+    '\ufe0e': '', '\ufe0f': '', '\u200d': '',  # variation selector & zero-width joiner
+    '→': '->', '←': '<-', '↑': '^', '↓': 'v',
+    '•': '-', '–': '-', '—': '-',
+    '\u201c': '"', '\u201d': '"', '\u2018': "'", '\u2019': "'",
+    '…': '...', '°': ' derajat', '±': '+/-', '×': 'x', '÷': '/',
+    '≤': '<=', '≥': '>=', '≠': '!=', '≈': '~', '∞': 'infinity',
+    '∑': 'sum', '∏': 'product', '√': 'sqrt', '∫': 'integral', '∂': 'partial',
+    '∆': 'delta', '∇': 'nabla', '∈': 'in', '∉': 'not in', '⊂': 'subset',
+    '⊃': 'superset', '∪': 'union', '∩': 'intersection', '∅': 'empty',
+    '∀': 'for all', '∃': 'exists', '∄': 'not exists', '∴': 'therefore',
+    '∵': 'because', '≡': 'equivalent', '≅': 'congruent', '∝': 'proportional',
+    'α': 'alpha', 'β': 'beta', 'γ': 'gamma', 'δ': 'delta', 'ε': 'epsilon',
+    'ζ': 'zeta', 'η': 'eta', 'θ': 'theta', 'ι': 'iota', 'κ': 'kappa',
+    'λ': 'lambda', 'μ': 'mu', 'ν': 'nu', 'ξ': 'xi', 'ο': 'omicron',
+    'π': 'pi', 'ρ': 'rho', 'σ': 'sigma', 'τ': 'tau', 'υ': 'upsilon',
+    'φ': 'phi', 'χ': 'chi', 'ψ': 'psi', 'ω': 'omega',
+    'Α': 'Alpha', 'Β': 'Beta', 'Γ': 'Gamma', 'Δ': 'Delta', 'Ε': 'Epsilon',
+    'Ζ': 'Zeta', 'Η': 'Eta', 'Θ': 'Theta', 'Ι': 'Iota', 'Κ': 'Kappa',
+    'Λ': 'Lambda', 'Μ': 'Mu', 'Ν': 'Nu', 'Ξ': 'Xi', 'Ο': 'Omicron',
+    'Π': 'Pi', 'Ρ': 'Rho', 'Σ': 'Sigma', 'Τ': 'Tau', 'Υ': 'Upsilon',
+    'Φ': 'Phi', 'Χ': 'Chi', 'Ψ': 'Psi', 'Ω': 'Omega'
+}
+# Modifier warna kulit emoji (U+1F3FB-U+1F3FF) dibuang
+PDF_CHAR_REPLACEMENTS.update({chr(cp): '' for cp in range(0x1F3FB, 0x1F400)})
+def _latin1_fallback(char):
+    """Dekomposisi NFKD untuk karakter di luar latin-1, misalnya 'ő' -> 'o' dan 'ﬁ' -> 'fi'"""
+    decomposed = unicodedata.normalize('NFKD', char)
+    return ''.join(c for c in decomposed if ord(c) < 256 and not unicodedata.combining(c))
+
+class _PDFTranslationTable(dict):
+    """Tabel str.translate yang melengkapi dirinya sendiri.
+
+    Latin-1 dipetakan ke dirinya sendiri dan karakter di tabel pengganti ke
+    penggantinya; karakter lain dihitung sekali saat pertama kali muncul lalu
+    disimpan, sehingga panggilan berikutnya cukup satu lintasan translate.
+    """
+    def __init__(self, unknown):
+        super().__init__({cp: cp for cp in range(256)})
+        self.update(str.maketrans(PDF_CHAR_REPLACEMENTS))
+        self.unknown = unknown
+
+    def __missing__(self, codepoint):
+        value = _latin1_fallback(chr(codepoint)) or self.unknown
+        self[codepoint] = value
+        return value
+
+@lru_cache(maxsize=8)
+def _pdf_translation_table(unknown):
+    return _PDFTranslationTable(unknown)
+
+def clean_text_for_pdf(text, unknown=''):
+    """Bersihkan teks dari karakter Unicode yang tidak didukung oleh latin-1.
+
+    Karakter di tabel diganti, karakter beraksen dinormalisasi (NFKD) ke huruf
+    dasarnya, dan karakter lain yang tetap tidak terwakili diganti `unknown`
+    (default: dihapus). Semua dilakukan dalam satu kali lintasan teks.
+    """
+    if text.isascii():
+        # Tidak ada karakter ASCII di tabel pengganti
+        return text
+    return text.translate(_pdf_translation_table(unknown))
+
+@timed('generate_pdf_report')
+def generate_pdf_report(user_data):
+    """Hasilkan laporan PDF dari data pengguna"""
+    from pdf_report import PDFReport
+    
+    pdf = PDFReport()
+    pdf.add_page()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    
+    # Profil Klien
+    pdf.chapter_title('Profil Klien')
+    profile_data = [
+        f"Nama: {clean_text_for_pdf(user_data['nama'])}",
+        f"Usia: {user_data['usia']} tahun",
+        f"Usia Pensiun: {user_data['usia_pensiun']} tahun",
+        f"Status Keluarga: {clean_text_for_pdf(user_data['status_keluarga'])}"
+    ]
+    pdf.chapter_body("\n".join(profile_data))
+    
+    # Analisis Keuangan
+    analysis = user_data['analysis']
+    pdf.chapter_title('Analisis Keuangan')
+    financial_data = [
+        f"Net Worth: Rp {analysis['net_worth']:,.0f}",
+        f"Rasio Likuiditas: {analysis['liquidity_ratio']} bulan",
+        f"Debt-to-Income Ratio: {analysis['dti_ratio']:.2f}",
+        f"Savings Rate: {analysis['savings_rate']:.2%}"
+    ]
+    pdf.chapter_body("\n".join(financial_data))
+    
+    # Rekomendasi - Bersihkan emoji dari teks
+    pdf.chapter_title('Rekomendasi')
+    clean_recommendations = clean_text_for_pdf(analysis['recommendations'])
+    pdf.chapter_body(clean_recommendations)
+    
+    # Tujuan Keuangan
+    pdf.chapter_title('Tujuan Keuangan')
+    goals = []
+    for goal in analysis['goal_projections']:
+        goals.append(
+            f"{clean_text_for_pdf(goal['nama'])}: "
+            f"Target Rp {goal['target_sekarang']:,.0f} -> "
+            f"Rp {goal['target_masa_depan']:,.0f} "
+            f"({goal['jangka_waktu']} tahun) - "
+            f"Setoran: Rp {goal['setoran_bulanan']:,.0f}/bulan"
+        )
+    pdf.chapter_body("\n".join(goals))
+    
+    report_bytes = pdf.output(dest='S').encode('latin1')
+    observe(PDF_BYTES, len(report_bytes))
+    return report_bytes
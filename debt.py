@@ -0,0 +1,194 @@
+import numpy as np
+
+from core import DEBT_RATES
+from metrics import timed
+from projection import DEBT_TENORS
+
+DEBT_NAMES = tuple(DEBT_RATES)
+
+STRATEGIES = ('minimum', 'avalanche', 'snowball', 'refinance')
+STRATEGY_LABELS = {
+    'minimum': "Cicilan Minimum",
+    'avalanche': "Avalanche (bunga tertinggi dulu)",
+    'snowball': "Snowball (saldo terkecil dulu)",
+    'refinance': "Refinance + Avalanche"
+}
+REFINANCE_RATE = 0.11  # bunga tahunan pinjaman konsolidasi
+REFINANCE_FEE = 0.02  # biaya refinance, ditambahkan ke pokok yang dialihkan
+
+MAX_MONTHS = 600  # batas simulasi (50 tahun)
+PAID_EPSILON = 1.0  # sisa saldo (rupiah) yang dianggap lunas
+
+# ====================== INPUT UTANG ======================
+def default_minimum_payment(balance, annual_rate, years):
+    """Cicilan anuitas sebagai cicilan minimum jika tidak diisi"""
+    balance = np.asarray(balance, dtype=float)
+    rate = np.asarray(annual_rate, dtype=float) / 12
+    months = np.asarray(years, dtype=float) * 12
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(rate > 0, balance * rate / -np.expm1(-months * np.log1p(rate)), balance / months)
+
+def _debt_arrays(table):
+    """Saldo, bunga tahunan dan cicilan minimum (klien x utang) dari tabel kolom user_data"""
+    balances = np.column_stack([np.asarray(table[name], dtype=float) for name in DEBT_NAMES])
+    rates = np.column_stack([
+        np.asarray(table[f'bunga_{name}'], dtype=float) if f'bunga_{name}' in table
+        else np.full(len(balances), DEBT_RATES[name])
+        for name in DEBT_NAMES
+    ])
+    minimums = np.column_stack([
+        np.asarray(table[f'cicilan_{name}'], dtype=float) if f'cicilan_{name}' in table
+        else np.zeros(len(balances))
+        for name in DEBT_NAMES
+    ])
+    # Cicilan 0 / kosong berarti pakai anuitas dengan tenor standar
+    defaults = default_minimum_payment(balances, rates, [DEBT_TENORS[name] for name in DEBT_NAMES])
+    minimums = np.where(np.nan_to_num(minimums) > 0, minimums, defaults)
+    return balances, np.nan_to_num(rates), minimums
+
+# ====================== SIMULASI PELUNASAN ======================
+def _simulate(balances, rates, minimums, extra, strategies=STRATEGIES, max_months=MAX_MONTHS,
+              record_history=False):
+    """Simulasikan pelunasan bulanan untuk semua strategi dan klien sekaligus.
+
+    Setiap pasangan (strategi, klien) menjadi satu baris state berdimensi
+    (baris, utang). Loop hanya berjalan per bulan (saldo bulan berikutnya
+    bergantung pada pembayaran bulan ini); baris yang sudah lunas dikeluarkan
+    dari array kerja sehingga biaya tiap bulan sebanding dengan jumlah baris
+    yang masih berutang. Strategi selain `minimum` mempertahankan total
+    pembayaran (jumlah cicilan minimum + `extra`) dan mengalirkan sisanya ke
+    utang berikutnya sesuai urutan strategi.
+    """
+    n_strategies, n_clients = len(strategies), len(balances)
+    shape = (n_strategies, n_clients)
+    balance = np.broadcast_to(balances, shape + balances.shape[1:]).copy()
+    monthly_rate = np.broadcast_to(rates / 12, balance.shape).copy()
+    minimum = np.broadcast_to(minimums, balance.shape)
+
+    if 'refinance' in strategies:
+        # Utang berbunga di atas REFINANCE_RATE dialihkan ke pinjaman konsolidasi
+        i = strategies.index('refinance')
+        moved = monthly_rate[i] > REFINANCE_RATE / 12
+        balance[i] = np.where(moved, balance[i] * (1 + REFINANCE_FEE), balance[i])
+        monthly_rate[i] = np.where(moved, REFINANCE_RATE / 12, monthly_rate[i])
+
+    rollover = np.array([s != 'minimum' for s in strategies])[:, None]
+    snowball = np.array([s == 'snowball' for s in strategies])[:, None]
+
+    # Ratakan ke baris (strategi x klien)
+    n_debts = balance.shape[-1]
+    balance = balance.reshape(-1, n_debts)
+    monthly_rate = monthly_rate.reshape(-1, n_debts)
+    minimum = minimum.reshape(-1, n_debts)
+    budget = np.where(rollover, minimums.sum(axis=1) + extra, 0.0).ravel()
+    snowball = np.broadcast_to(snowball, shape).ravel()
+    interest_total = np.zeros(balance.shape[0])
+    paid_total = np.zeros(balance.shape[0])
+    debt_free = np.where(balance.sum(axis=1) <= PAID_EPSILON, 0.0, np.nan)
+    history = [balance.sum(axis=1)] if record_history else None
+
+    rows = np.flatnonzero(np.isnan(debt_free))
+    work = [balance[rows], monthly_rate[rows], minimum[rows], budget[rows], snowball[rows]]
+    interest_rows, paid_rows = np.zeros(len(rows)), np.zeros(len(rows))
+
+    for month in range(1, max_months + 1):
+        if not len(rows):
+            break
+        bal, rate, mins, row_budget, row_snowball = work
+        interest = bal * rate
+        bal = bal + interest
+        interest_rows += interest.sum(axis=1)
+
+        payment = np.minimum(mins, bal)
+        remaining = bal - payment
+        available = np.maximum(row_budget - payment.sum(axis=1), 0.0)
+
+        # Water-filling sisa anggaran: bunga tertinggi dulu, atau saldo terkecil untuk snowball
+        order = np.argsort(np.where(row_snowball[:, None], remaining, -rate), axis=1, kind='stable')
+        ordered = np.take_along_axis(remaining, order, axis=1)
+        before = np.cumsum(ordered, axis=1) - ordered
+        extra_payment = np.empty_like(ordered)
+        np.put_along_axis(extra_payment, order, np.clip(available[:, None] - before, 0.0, ordered), axis=1)
+
+        bal = remaining - extra_payment
+        bal[bal <= PAID_EPSILON] = 0.0
+        paid_rows += payment.sum(axis=1) + extra_payment.sum(axis=1)
+        work[0] = bal
+
+        if record_history:
+            snapshot = np.zeros(len(debt_free))
+            snapshot[rows] = bal.sum(axis=1)
+            history.append(snapshot)
+
+        done = bal.sum(axis=1) == 0
+        if done.any():
+            # Simpan hasil baris yang lunas lalu keluarkan dari array kerja
+            finished = rows[done]
+            debt_free[finished] = month
+            interest_total[finished] = interest_rows[done]
+            paid_total[finished] = paid_rows[done]
+            keep = ~done
+            rows, interest_rows, paid_rows = rows[keep], interest_rows[keep], paid_rows[keep]
+            work = [array[keep] for array in work]
+
+    # Baris yang tidak lunas dalam max_months
+    interest_total[rows] = interest_rows
+    paid_total[rows] = paid_rows
+    return {
+        'bulan_lunas': debt_free.reshape(shape),
+        'total_bunga': interest_total.reshape(shape),
+        'total_bayar': paid_total.reshape(shape),
+        'saldo': np.stack(history, axis=-1).reshape(shape + (-1,)) if record_history else None
+    }
+
+@timed('simulate_debt_payoff')
+def simulate_debt_payoff(user_data, extra_payment=0, strategies=STRATEGIES, max_months=MAX_MONTHS):
+    """Bandingkan strategi pelunasan utang untuk satu klien.
+
+    Bunga dan cicilan minimum diambil dari `bunga_<utang>` dan
+    `cicilan_<utang>` (cicilan 0 = anuitas dengan tenor standar).
+    `extra_payment` adalah dana tambahan per bulan di luar cicilan minimum.
+    Hasilnya ringkasan per strategi (bulan lunas None jika tidak lunas dalam
+    `max_months`) dan total saldo per bulan untuk grafik.
+    """
+    balances, rates, minimums = _debt_arrays({k: [v] for k, v in user_data.items()})
+    result = _simulate(
+        balances, rates, minimums, np.array([float(extra_payment)]), strategies, max_months,
+        record_history=True
+    )
+    summary = []
+    for i, strategy in enumerate(strategies):
+        months = result['bulan_lunas'][i, 0]
+        summary.append({
+            'strategi': strategy,
+            'label': STRATEGY_LABELS[strategy],
+            'bulan_lunas': None if np.isnan(months) else int(months),
+            'total_bunga': float(result['total_bunga'][i, 0]),
+            'total_bayar': float(result['total_bayar'][i, 0])
+        })
+    return {
+        'strategi': summary,
+        'saldo': {strategy: result['saldo'][i, 0] for i, strategy in enumerate(strategies)}
+    }
+
+def simulate_debt_payoff_batch(clients, extra_payment=0, strategies=STRATEGIES, max_months=MAX_MONTHS):
+    """Versi batch dari simulate_debt_payoff untuk tabel klien.
+
+    `extra_payment` boleh skalar atau array per klien. Hasilnya DataFrame
+    long-form dengan satu baris per (client_id, strategi); `bulan_lunas`
+    bernilai NaN jika tidak lunas dalam `max_months`.
+    """
+    import pandas as pd
+    from batch import _as_frame
+
+    clients = _as_frame(clients)
+    balances, rates, minimums = _debt_arrays(clients)
+    extra = np.broadcast_to(np.asarray(extra_payment, dtype=float), (len(clients),))
+    result = _simulate(balances, rates, minimums, extra, strategies, max_months)
+    return pd.DataFrame({
+        'client_id': np.tile(clients.index.to_numpy(), len(strategies)),
+        'strategi': np.repeat(strategies, len(clients)),
+        'bulan_lunas': result['bulan_lunas'].ravel(),
+        'total_bunga': result['total_bunga'].ravel(),
+        'total_bayar': result['total_bayar'].ravel()
+    })
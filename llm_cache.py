@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+
+DEFAULT_PATH = os.environ.get("FPA_LLM_CACHE_PATH", os.path.join(".cache", "llm_cache.sqlite3"))
+DEFAULT_TTL = 7 * 24 * 3600  # detik
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at);
+"""
+
+# ====================== CACHE RESPONS LLM ======================
+def normalize_prompt(prompt):
+    """Normalisasi pertanyaan: Unicode NFKC, huruf kecil, spasi dirapatkan, tanda baca akhir dibuang"""
+    text = unicodedata.normalize("NFKC", prompt).casefold()
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.rstrip(" ?!.")
+
+def make_key(model, temperature, messages, question):
+    """Kunci cache dari model, temperature dan daftar pesan yang dikirim ke model.
+
+    Profil, riwayat dan ringkasan di-hash persis; hanya `question`, pertanyaan
+    pengguna di akhir pesan terakhir, yang dinormalisasi sehingga variasi spasi,
+    huruf besar dan tanda baca akhir tetap memakai jawaban yang sama.
+    """
+    messages = [{"role": m["role"], "content": m["content"]} for m in messages]
+    last = messages[-1]["content"]
+    if question and last.endswith(question):
+        messages[-1]["content"] = last[:-len(question)]
+    parts = {
+        "model": model,
+        "temperature": temperature,
+        "messages": messages,
+        "question": normalize_prompt(question)
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+class LLMResponseCache:
+    """Cache respons LLM berbasis SQLite dengan TTL dan batas ukuran.
+
+    Setiap operasi membuka koneksi sendiri dan SQLite memakai mode WAL,
+    sehingga file yang sama aman dipakai oleh banyak thread dan proses worker.
+    """
+    def __init__(self, path=DEFAULT_PATH, ttl=DEFAULT_TTL,
+                 max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._initialized = False
+
+    def _connect(self):
+        if not self._initialized:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout = 10000")
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.executescript(_SCHEMA)
+            self._initialized = True
+        return conn
+
+    def get(self, key):
+        """Ambil respons yang belum kedaluwarsa; None jika tidak ada"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            response, created_at = row
+            if now - created_at > self.ttl:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            return response
+        finally:
+            conn.close()
+
+    def set(self, key, model, response):
+        """Simpan respons lalu buang entri kedaluwarsa dan entri terlama jika melebihi batas"""
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, size, now, now)
+            )
+            conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+            count, total = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            if count > self.max_entries or total > self.max_bytes:
+                self._evict_lru(conn, count, total)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _evict_lru(self, conn, count, total):
+        """Hapus entri yang paling lama tidak diakses sampai di bawah batas"""
+        rows = conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+        evict = []
+        for key, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            evict.append((key,))
+            count -= 1
+            total -= size
+        conn.executemany("DELETE FROM responses WHERE key = ?", evict)
+
+    def stats(self):
+        """Jumlah entri dan total ukuran cache"""
+        conn = self._connect()
+        try:
+            count, total = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            return {"entries": count, "bytes": total}
+        finally:
+            conn.close()
+
+    def clear(self):
+        """Hapus semua entri"""
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM responses")
+        finally:
+            conn.close()
+
+LLM_CACHE = LLMResponseCache()
@@ -1,13 +1,17 @@
 import streamlit as st
-import numpy as np
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
-from fpdf import FPDF
-import requests
-import json
-import base64
-from datetime import datetime
+from core import DEBT_LABELS, DEBT_RATES, calculate_financials, generate_pdf_report
+from result_cache import RESULT_CACHE, financial_inputs, stable_hash
+from llm_cache import LLM_CACHE, make_key
+from chat_store import CHAT_STORE, client_key, session_token
+from prompt_context import DEFAULT_TOKEN_BUDGET, build_messages
+from metrics import timer, to_json, write_metrics_file
+
+# Modul berat (plotly, pandas, fpdf, requests) diimpor di dalam fungsi yang
+# memakainya, sehingga form input di langkah 1 tidak ikut menanggung biayanya.
+#
+# Bagian interaktif halaman analisis (grafik dengan slider, chat, laporan) adalah
+# fragment: interaksi di dalamnya hanya menjalankan ulang fungsi tersebut, bukan
+# seluruh skrip beserta semua grafik dan riwayat chat.
 
 # Konfigurasi tampilan
 st.set_page_config(
@@ -51,339 +55,170 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# ====================== FUNGSI PERHITUNGAN KEUANGAN ======================
-def calculate_future_value(present_value, years, inflation_rate):
-    """Hitung nilai masa depan dengan penyesuaian inflasi"""
-    return present_value * (1 + inflation_rate) ** years
-
-def calculate_monthly_savings(future_value, years, return_rate):
-    """Hitung setoran bulanan yang diperlukan"""
-    n = years * 12
-    r = return_rate / 12
-    return (future_value * r) / ((1 + r) ** n - 1)
-
-def calculate_financials(user_data):
-    """Lakukan semua perhitungan keuangan"""
-    # Hitung net worth
-    assets = user_data['tabungan'] + user_data['investasi'] + user_data['properti']
-    liabilities = user_data['kpr'] + user_data['kartu_kredit'] + user_data['pinjaman_lain']
-    net_worth = assets - liabilities
-    
-    # Hitung rasio keuangan
-    pendapatan_total = user_data['pendapatan_tetap'] + user_data['pendapatan_variabel']
-    pengeluaran_total = user_data['pengeluaran_wajib'] + user_data['pengeluaran_diskresioner']
-    
-    liquidity_ratio = user_data['tabungan'] / (pengeluaran_total / 3)  # dalam bulan
-    dti_ratio = (user_data['kpr'] + user_data['kartu_kredit'] + user_data['pinjaman_lain']) / pendapatan_total
-    savings_rate = (pendapatan_total - pengeluaran_total) / pendapatan_total
-    
-    # Proyeksi tujuan keuangan
-    goal_projections = []
-    for goal in user_data['tujuan']:
-        future_value = calculate_future_value(
-            goal['target'], 
-            years=goal['tahun'], 
-            inflation_rate=0.05  # asumsi inflasi 5%
-        )
-        monthly_payment = calculate_monthly_savings(
-            future_value, 
-            years=goal['tahun'], 
-            return_rate=0.1  # asumsi return 10% p.a.
-        )
-        goal_projections.append({
-            'nama': goal['nama'],
-            'target_sekarang': goal['target'],
-            'target_masa_depan': future_value,
-            'setoran_bulanan': monthly_payment,
-            'jangka_waktu': goal['tahun']
-        })
-    
-    # Rekomendasi AI sederhana
-    recommendations = generate_recommendations(user_data, net_worth, dti_ratio, savings_rate)
-    
-    return {
-        'net_worth': net_worth,
-        'liquidity_ratio': round(liquidity_ratio, 1),
-        'dti_ratio': round(dti_ratio, 2),
-        'savings_rate': savings_rate,
-        'goal_projections': goal_projections,
-        'recommendations': recommendations
-    }
-
-def generate_recommendations(user_data, net_worth, dti, savings_rate):
-    """Buat rekomendasi keuangan sederhana"""
-    recs = []
-    
-    # Rekomendasi dana darurat
-    monthly_expenses = user_data['pengeluaran_wajib'] + user_data['pengeluaran_diskresioner']
-    emergency_fund = monthly_expenses * 6
-    if user_data['tabungan'] < emergency_fund:
-        recs.append(f"💡 Tingkatkan dana darurat hingga Rp {emergency_fund:,.0f} (6x pengeluaran bulanan)")
-    
-    # Rekomendasi utang
-    if dti > 0.4:
-        recs.append("⚠️ Kendalikan rasio utang-pendapatan Anda. Pertimbangkan melunasi utang berbiaya tinggi terlebih dahulu")
-    
-    # Rekomendasi tabungan
-    if savings_rate < 0.2:
-        recs.append(f"🔧 Tingkatkan savings rate Anda. Idealnya minimal 20% dari pendapatan")
-    
-    # Rekomendasi alokasi aset
-    equity_pct = min(90, 110 - user_data['usia'])
-    recs.append(f"📊 Alokasi aset rekomendasi: {equity_pct}% saham, {100-equity_pct}% pendapatan tetap")
-    
-    return "\n\n".join(recs)
-
+# ====================== FUNGSI VISUALISASI ======================
 def plot_goals(goals):
-    """Buat visualisasi tujuan keuangan menggunakan Plotly"""
-    goal_names = [g['nama'] for g in goals]
-    current_targets = [g['target_sekarang'] / 1e6 for g in goals]
-    future_targets = [g['target_masa_depan'] / 1e6 for g in goals]
-    
-    # Buat figure dengan Plotly
-    fig = go.Figure()
-    
-    # Tambahkan bar untuk target sekarang
-    fig.add_trace(go.Bar(
-        name='Target Sekarang',
-        x=goal_names,
-        y=current_targets,
-        marker_color='#6a11cb'
-    ))
-    
-    # Tambahkan bar untuk target masa depan
-    fig.add_trace(go.Bar(
-        name='Target Masa Depan',
-        x=goal_names,
-        y=future_targets,
-        marker_color='#2575fc'
-    ))
-    
-    # Update layout
-    fig.update_layout(
-        title='Perbandingan Target Keuangan',
-        xaxis_title='Tujuan Keuangan',
-        yaxis_title='Juta IDR',
-        barmode='group',
-        height=500,
-        showlegend=True,
-        plot_bgcolor='white',
-        paper_bgcolor='white'
-    )
-    
-    # Update axes
-    fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='lightgray')
-    fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='lightgray')
+    """Tampilkan grafik tujuan keuangan (figure di-cache berdasarkan isi tujuan)"""
+    from charts import build_goals_figure
     
-    st.plotly_chart(fig, use_container_width=True)
+    with timer('plot_goals'):
+        fig = RESULT_CACHE.get_or_compute('plot_goals', goals, lambda: build_goals_figure(goals))
+        st.plotly_chart(fig, use_container_width=True)
 
-# ====================== FUNGSI AI CHAT ======================
-def get_ai_response(prompt, model="deepseek/deepseek-r1-0528-qwen3-8b:free", api_key=None):
-    """Dapatkan respons dari OpenRouter API"""
-    if not api_key:
-        return "🔑 Silakan masukkan API Key OpenRouter di sidebar"
-    
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
+@st.fragment
+def show_lifetime_projection(user_data):
+    """Tampilkan proyeksi kekayaan bulanan dengan asumsi yang bisa diubah lewat slider"""
+    from charts import build_projection_figure
+    from projection import LIFE_EXPECTANCY, RETIREMENT_EXPENSE_RATIO, project_lifetime
     
-    payload = {
-        "model": model,
-        "messages": [{"role": "user", "content": prompt}],
-        "temperature": 0.7,
-        "max_tokens": 1000
-    }
-    
-    try:
-        response = requests.post(
-            "https://openrouter.ai/api/v1/chat/completions",
-            headers=headers,
-            json=payload,
-            timeout=30
+    cols = st.columns(4)
+    params = {
+        'return_rate': cols[0].slider("Return investasi (% p.a.)", 0.0, 20.0, 10.0, 0.5, key="proj_return") / 100,
+        'inflation_rate': cols[1].slider("Inflasi (% p.a.)", 0.0, 15.0, 5.0, 0.5, key="proj_inflation") / 100,
+        'retirement_expense_ratio': cols[2].slider(
+            "Pengeluaran saat pensiun (%)", 30, 120, int(RETIREMENT_EXPENSE_RATIO * 100), 5, key="proj_expense"
+        ) / 100,
+        'life_expectancy': cols[3].slider(
+            "Usia harapan hidup", max(user_data['usia'] + 1, 50), 110,
+            min(110, max(user_data['usia'] + 1, 50, LIFE_EXPECTANCY, user_data['usia_pensiun'])),
+            key="proj_life"
         )
-        response.raise_for_status()
-        return response.json()['choices'][0]['message']['content']
-    except Exception as e:
-        return f"Maaf, terjadi kesalahan: {str(e)}"
-
-# ====================== FUNGSI LAPORAN PDF ======================
-class PDFReport(FPDF):
-    """Kelas untuk membuat laporan PDF"""
-    def header(self):
-        self.set_font('Arial', 'B', 16)
-        self.cell(0, 10, 'Laporan Perencanaan Keuangan', 0, 1, 'C')
-        self.set_font('Arial', '', 12)
-        self.cell(0, 10, f"Tanggal: {datetime.now().strftime('%d %B %Y')}", 0, 1, 'C')
-        self.ln(10)
-    
-    def chapter_title(self, title):
-        self.set_font('Arial', 'B', 14)
-        self.cell(0, 10, title, 0, 1)
-        self.ln(4)
-    
-    def chapter_body(self, body):
-        self.set_font('Arial', '', 12)
-        self.multi_cell(0, 8, body)
-        self.ln()
-
-def clean_text_for_pdf(text):
-    """Bersihkan teks dari karakter Unicode yang tidak didukung oleh latin-1"""
-    # Daftar karakter Unicode yang perlu diganti
-    unicode_replacements = {
-        '💡': '',
-        '⚠️': '',
-        '🔧': '',
-        '📊': '',
-        '→': '->',
-        '←': '<-',
-        '↑': '^',
-        '↓': 'v',
-        '•': '-',
-        '–': '-',
-        '—': '-',
-        '"': '"',
-        '"': '"',
-        ''': "'",
-        ''': "'",
-        '…': '...',
-        '°': ' derajat',
-        '±': '+/-',
-        '×': 'x',
-        '÷': '/',
-        '≤': '<=',
-        '≥': '>=',
-        '≠': '!=',
-        '≈': '~',
-        '∞': 'infinity',
-        '∑': 'sum',
-        '∏': 'product',
-        '√': 'sqrt',
-        '∫': 'integral',
-        '∂': 'partial',
-        '∆': 'delta',
-        '∇': 'nabla',
-        '∈': 'in',
-        '∉': 'not in',
-        '⊂': 'subset',
-        '⊃': 'superset',
-        '∪': 'union',
-        '∩': 'intersection',
-        '∅': 'empty',
-        '∀': 'for all',
-        '∃': 'exists',
-        '∄': 'not exists',
-        '∴': 'therefore',
-        '∵': 'because',
-        '≡': 'equivalent',
-        '≅': 'congruent',
-        '∝': 'proportional',
-        '∞': 'infinity',
-        'α': 'alpha',
-        'β': 'beta',
-        'γ': 'gamma',
-        'δ': 'delta',
-        'ε': 'epsilon',
-        'ζ': 'zeta',
-        'η': 'eta',
-        'θ': 'theta',
-        'ι': 'iota',
-        'κ': 'kappa',
-        'λ': 'lambda',
-        'μ': 'mu',
-        'ν': 'nu',
-        'ξ': 'xi',
-        'ο': 'omicron',
-        'π': 'pi',
-        'ρ': 'rho',
-        'σ': 'sigma',
-        'τ': 'tau',
-        'υ': 'upsilon',
-        'φ': 'phi',
-        'χ': 'chi',
-        'ψ': 'psi',
-        'ω': 'omega',
-        'Α': 'Alpha',
-        'Β': 'Beta',
-        'Γ': 'Gamma',
-        'Δ': 'Delta',
-        'Ε': 'Epsilon',
-        'Ζ': 'Zeta',
-        'Η': 'Eta',
-        'Θ': 'Theta',
-        'Ι': 'Iota',
-        'Κ': 'Kappa',
-        'Λ': 'Lambda',
-        'Μ': 'Mu',
-        'Ν': 'Nu',
-        'Ξ': 'Xi',
-        'Ο': 'Omicron',
-        'Π': 'Pi',
-        'Ρ': 'Rho',
-        'Σ': 'Sigma',
-        'Τ': 'Tau',
-        'Υ': 'Upsilon',
-        'Φ': 'Phi',
-        'Χ': 'Chi',
-        'Ψ': 'Psi',
-        'Ω': 'Omega'
     }
     
-    cleaned_text = text
-    for unicode_char, replacement in unicode_replacements.items():
-        cleaned_text = cleaned_text.replace(unicode_char, replacement)
-    
-    # Hapus karakter Unicode lainnya yang tidak dalam daftar
-    cleaned_text = ''.join(char for char in cleaned_text if ord(char) < 256)
+    inputs = financial_inputs(user_data)
+    projection = RESULT_CACHE.get_or_compute(
+        'project_lifetime', {'user_data': inputs, **params}, lambda: project_lifetime(inputs, **params)
+    )
     
-    return cleaned_text
+    cols = st.columns(3)
+    cols[0].metric("Net Worth saat Pensiun", f"Rp {projection['net_worth_pensiun']:,.0f}")
+    cols[1].metric("Aset Likuid saat Pensiun", f"Rp {projection['aset_likuid_pensiun']:,.0f}")
+    if projection['usia_dana_habis'] is None:
+        cols[2].metric("Dana Pensiun Habis", "Tidak habis")
+    else:
+        cols[2].metric("Dana Pensiun Habis", f"Usia {projection['usia_dana_habis']:.0f}")
+    
+    with timer('plot_projection'):
+        st.plotly_chart(build_projection_figure(projection), use_container_width=True)
+    if projection['usia_defisit_pertama'] is not None:
+        st.warning(f"⚠️ Aset likuid mulai defisit pada usia {projection['usia_defisit_pertama']:.1f} tahun")
+    st.caption("Pendapatan dan pengeluaran naik mengikuti inflasi, cicilan utang memakai cicilan minimum yang "
+               "diisi (atau anuitas dengan tenor standar jika 0), dan dana tujuan ditarik dari aset likuid pada "
+               "tahun jatuh temponya")
 
-def generate_pdf_report(user_data):
-    """Hasilkan laporan PDF dari data pengguna"""
-    pdf = PDFReport()
-    pdf.add_page()
-    pdf.set_auto_page_break(auto=True, margin=15)
-    
-    # Profil Klien
-    pdf.chapter_title('Profil Klien')
-    profile_data = [
-        f"Nama: {clean_text_for_pdf(user_data['nama'])}",
-        f"Usia: {user_data['usia']} tahun",
-        f"Usia Pensiun: {user_data['usia_pensiun']} tahun",
-        f"Status Keluarga: {clean_text_for_pdf(user_data['status_keluarga'])}"
-    ]
-    pdf.chapter_body("\n".join(profile_data))
-    
-    # Analisis Keuangan
-    analysis = user_data['analysis']
-    pdf.chapter_title('Analisis Keuangan')
-    financial_data = [
-        f"Net Worth: Rp {analysis['net_worth']:,.0f}",
-        f"Rasio Likuiditas: {analysis['liquidity_ratio']} bulan",
-        f"Debt-to-Income Ratio: {analysis['dti_ratio']:.2f}",
-        f"Savings Rate: {analysis['savings_rate']:.2%}"
-    ]
-    pdf.chapter_body("\n".join(financial_data))
-    
-    # Rekomendasi - Bersihkan emoji dari teks
-    pdf.chapter_title('Rekomendasi')
-    clean_recommendations = clean_text_for_pdf(analysis['recommendations'])
-    pdf.chapter_body(clean_recommendations)
-    
-    # Tujuan Keuangan
-    pdf.chapter_title('Tujuan Keuangan')
-    goals = []
-    for goal in analysis['goal_projections']:
-        goals.append(
-            f"{clean_text_for_pdf(goal['nama'])}: "
-            f"Target Rp {goal['target_sekarang']:,.0f} -> "
-            f"Rp {goal['target_masa_depan']:,.0f} "
-            f"({goal['jangka_waktu']} tahun) - "
-            f"Setoran: Rp {goal['setoran_bulanan']:,.0f}/bulan"
+def show_goal_allocation(allocations, surplus):
+    """Tampilkan pembagian surplus bulanan ke tujuan berdasarkan prioritas"""
+    import pandas as pd
+    
+    table = pd.DataFrame([
+        {
+            'Tujuan': a['nama'],
+            'Prioritas': a['prioritas'],
+            'Setoran Dibutuhkan': f"Rp {a['setoran_bulanan']:,.0f}",
+            'Alokasi': f"Rp {a['alokasi_bulanan']:,.0f}",
+            'Terdanai': f"{a['persen_terdanai']:.0%}",
+            'Status': a['status'],
+            'Perkiraan Tercapai': (
+                f"Tahun ke-{a['tahun_tercapai']}" if a['tahun_tercapai'] is not None else "> 50 tahun tambahan"
+            ) if a['terlambat'] else "Tepat waktu"
+        }
+        for a in allocations
+    ])
+    st.dataframe(table, hide_index=True, use_container_width=True)
+    needed = sum(a['setoran_bulanan'] for a in allocations)
+    st.caption(f"Surplus bulanan Rp {max(surplus, 0):,.0f} dibagi berurutan menurut prioritas lalu tenggat "
+               f"terdekat (total kebutuhan Rp {needed:,.0f})")
+
+@st.fragment
+def show_sensitivity(goal_projections):
+    """Tampilkan heatmap setoran bulanan untuk grid asumsi inflasi x return x jangka waktu"""
+    from charts import build_sensitivity_figure
+    from core import INFLATION_RATE, RETURN_RATE
+    from sensitivity import DEFAULT_RESOLUTION, HORIZON_RANGE, grid_axes, monthly_savings_grid
+    
+    cols = st.columns([2, 2, 1])
+    names = [g['nama'] for g in goal_projections]
+    goal = goal_projections[cols[0].selectbox("Tujuan", range(len(names)), format_func=names.__getitem__,
+                                              key="sens_goal")]
+    default_years = min(max(int(goal['jangka_waktu']), HORIZON_RANGE[0]), HORIZON_RANGE[1])
+    years = cols[1].slider("Jangka waktu (tahun)", HORIZON_RANGE[0], HORIZON_RANGE[1], default_years,
+                           key=f"sens_years_{goal['nama']}")
+    resolution = cols[2].select_slider("Resolusi", [21, 51, DEFAULT_RESOLUTION, 201, 301],
+                                       value=DEFAULT_RESOLUTION, key="sens_resolution")
+    
+    # Hanya irisan jangka waktu yang ditampilkan yang dihitung; cukup cepat untuk
+    # diulang setiap rerun sehingga grid besar tidak perlu disimpan di RESULT_CACHE
+    inflation_rates, return_rates, _ = grid_axes(resolution)
+    grid = monthly_savings_grid(goal['target_sekarang'], inflation_rates, return_rates, [years])
+    with timer('plot_sensitivity'):
+        st.plotly_chart(
+            build_sensitivity_figure(grid, 0, (INFLATION_RATE, RETURN_RATE)),
+            use_container_width=True
         )
-    pdf.chapter_body("\n".join(goals))
+    st.caption(f"Tanda x = asumsi analisis (inflasi {INFLATION_RATE:.0%}, return {RETURN_RATE:.0%} p.a.). "
+               f"Grid {resolution}×{resolution} dihitung sekaligus.")
+
+@st.fragment
+def show_debt_payoff(user_data, surplus):
+    """Tampilkan perbandingan strategi pelunasan utang"""
+    import pandas as pd
+    from charts import build_debt_payoff_figure
+    from debt import REFINANCE_FEE, REFINANCE_RATE, STRATEGY_LABELS, simulate_debt_payoff
+    
+    extra_payment = st.number_input(
+        "Dana tambahan pelunasan per bulan (di luar cicilan minimum)", min_value=0,
+        value=int(max(surplus, 0) // 4 // 100_000 * 100_000), step=100_000, key="debt_extra"
+    )
+    inputs = financial_inputs(user_data)
+    result = RESULT_CACHE.get_or_compute(
+        'simulate_debt_payoff', {'user_data': inputs, 'extra_payment': extra_payment},
+        lambda: simulate_debt_payoff(inputs, extra_payment)
+    )
     
-    return pdf.output(dest='S').encode('latin1')
+    def duration(months):
+        if months is None:
+            return "Tidak lunas dalam 50 tahun"
+        return f"{months // 12} tahun {months % 12} bulan"
+    
+    strategies = result['strategi']
+    finished = [s for s in strategies if s['bulan_lunas'] is not None]
+    best = min(finished, key=lambda s: (s['total_bunga'], s['bulan_lunas']), default=None)
+    table = pd.DataFrame([
+        {
+            'Strategi': s['label'] + (" ⭐" if s is best else ""),
+            'Bebas Utang Dalam': duration(s['bulan_lunas']),
+            'Total Bunga': f"Rp {s['total_bunga']:,.0f}",
+            'Total Pembayaran': f"Rp {s['total_bayar']:,.0f}"
+        }
+        for s in strategies
+    ])
+    st.dataframe(table, hide_index=True, use_container_width=True)
+    if len(finished) < len(strategies):
+        st.warning("⚠️ Cicilan minimum lebih kecil dari bunga bulanan sehingga sebagian utang tidak pernah lunas")
+    
+    with timer('plot_debt_payoff'):
+        st.plotly_chart(build_debt_payoff_figure(result['saldo'], STRATEGY_LABELS), use_container_width=True)
+    st.caption(f"⭐ = total bunga terendah. Refinance mengalihkan utang berbunga di atas {REFINANCE_RATE:.0%} p.a. "
+               f"ke pinjaman konsolidasi (biaya {REFINANCE_FEE:.0%}); strategi selain cicilan minimum meneruskan "
+               "cicilan utang yang sudah lunas ke utang berikutnya")
+
+def show_goal_simulation(simulation):
+    """Tampilkan peluang sukses dan rentang persentil hasil simulasi"""
+    import pandas as pd
+    
+    table = pd.DataFrame([
+        {
+            'Tujuan': s['nama'],
+            'Peluang Sukses': f"{s['peluang_sukses']:.0%}",
+            'Target Terinflasi (median)': f"Rp {s['target_median']:,.0f}",
+            'Pesimis (P10)': f"Rp {s['p10']:,.0f}",
+            'Median (P50)': f"Rp {s['p50']:,.0f}",
+            'Optimis (P90)': f"Rp {s['p90']:,.0f}"
+        }
+        for s in simulation
+    ])
+    st.dataframe(table, hide_index=True, use_container_width=True)
+    st.caption("Simulasi 10.000 skenario return dan inflasi sesuai profil risiko, "
+               "dengan setoran bulanan seperti pada proyeksi di atas")
 
 # ====================== UI UTAMA APLIKASI ======================
 def main():
@@ -397,9 +232,12 @@ def main():
     if 'chat_history' not in st.session_state:
         st.session_state.chat_history = []
     if 'messages' not in st.session_state:
-        st.session_state.messages = [
-            {"role": "assistant", "content": "Hai! Saya AI Financial Advisor. Bagaimana saya bisa membantu perencanaan keuangan Anda hari ini?"}
-        ]
+        st.session_state.messages = []  # jendela pesan chat yang sedang ditampilkan
+    if 'chat_session_id' not in st.session_state:
+        # Token acak pemilik riwayat chat; disimpan di URL (?chat=...) agar riwayat
+        # kembali saat halaman dimuat ulang, tanpa bisa dibuka sesi lain
+        st.session_state.chat_session_id = session_token(st.query_params.get("chat"))
+        st.query_params["chat"] = st.session_state.chat_session_id
 
     # Sidebar untuk API key
     with st.sidebar:
@@ -408,6 +246,17 @@ def main():
         st.caption("Dapatkan API Key dari [OpenRouter](https://openrouter.ai/)")
         st.divider()
         st.subheader("⚙️ Pengaturan")
+        st.number_input(
+            "Batas token konteks AI", min_value=300, max_value=8000,
+            value=DEFAULT_TOKEN_BUDGET, step=100, key="token_budget",
+            help="Perkiraan token maksimum untuk profil, riwayat chat dan pertanyaan"
+        )
+        st.number_input(
+            "Jeda hedge mode tercepat (detik)", min_value=0.0, max_value=30.0,
+            value=0.0, step=0.5, key="hedge_delay",
+            help="Waktu tunggu sebelum model cadangan ikut dikirimi pertanyaan; 0 = otomatis dari latensi model"
+        )
+        st.toggle("🐞 Panel debug performa", key="debug_panel")
         st.caption("Versi Aplikasi: 1.0.0")
         st.caption("© 2024 Financial Planning Advisor")
 
@@ -425,6 +274,76 @@ def main():
     else:
         show_financial_analysis(openrouter_key)
 
+    # Statistik cache ditampilkan setelah perhitungan agar angkanya terkini
+    with st.sidebar:
+        stats = RESULT_CACHE.stats()
+        st.caption(
+            f"Cache analisis: {stats['hits']} hit / {stats['misses']} miss "
+            f"({stats['size']}/{stats['maxsize']} entri)"
+        )
+        if st.session_state.get("debug_panel"):
+            show_debug_panel()
+    
+    # Snapshot metrik ke file jika FPA_METRICS_FILE diset; kegagalan tidak boleh merusak halaman
+    try:
+        write_metrics_file()
+    except OSError:
+        pass
+
+def show_debug_panel():
+    """Tampilkan latensi per tahap dan counter instrumentasi di sidebar"""
+    data = to_json()
+    st.subheader("🐞 Debug Performa")
+    
+    def ms(value):
+        return round(value * 1e3, 2) if value is not None else None
+    
+    st.dataframe([
+        {
+            'Tahap': e['labels']['stage'],
+            'n': e['count'],
+            'Rata-rata (ms)': ms(e['mean']),
+            'p50 (ms)': ms(e['p50']),
+            'p95 (ms)': ms(e['p95'])
+        }
+        for e in data['fpa_stage_seconds']
+    ], hide_index=True)
+    
+    for e in data['fpa_ai_tokens']:
+        st.caption(f"Token {e['labels']['kind']} ({e['labels']['model']}): n={e['count']}, rata-rata {e['mean']:.0f}")
+    for e in data['fpa_http_responses_total']:
+        st.caption(f"HTTP {e['labels']['status']}: {e['value']}")
+    for e in data['fpa_http_retries_total']:
+        st.caption(f"Retry ({e['labels']['reason']}): {e['value']}")
+    for e in data['fpa_stage_errors_total']:
+        st.caption(f"Error {e['labels']['stage']}: {e['value']}")
+    for e in data['fpa_pdf_bytes']:
+        st.caption(f"PDF: {e['count']} laporan, rata-rata {e['mean'] / 1024:.1f} KB")
+    for e in data['fpa_rule_hits_total']:
+        st.caption(f"Aturan {e['labels']['rule']}: {e['value']} klien")
+    
+    from ai_scheduler import AI_SCHEDULER
+    queue_stats = AI_SCHEDULER.stats()
+    st.caption(f"Antrean AI: {queue_stats['antrean']} menunggu, {queue_stats['berjalan']}/{queue_stats['workers']} berjalan")
+    for e in data['fpa_ai_queue_wait_seconds']:
+        st.caption(f"Tunggu antrean ({e['labels']['model']}): n={e['count']}, p50 {ms(e['p50'])} ms, p95 {ms(e['p95'])} ms")
+    
+    from ai_hedge import MODEL_LATENCY
+    latencies = MODEL_LATENCY.summaries()
+    if latencies:
+        st.dataframe([
+            {
+                'Model': s['model'],
+                'n': s['n'],
+                'p50 token pertama (ms)': ms(s['p50']),
+                'p90 token pertama (ms)': ms(s['p90']),
+                'Gagal (%)': round(s['gagal'] * 100, 1)
+            }
+            for s in latencies
+        ], hide_index=True)
+    for e in data['fpa_ai_hedge_wins_total']:
+        st.caption(f"Tercepat ({e['labels']['model']}): {e['value']} kali")
+
 def client_info_form():
     """Form input data klien"""
     with st.form("client_info"):
@@ -464,6 +383,19 @@ def client_info_form():
         st.session_state.user_data['kartu_kredit'] = cols[0].number_input("Tagihan Kartu Kredit", min_value=0, value=0)
         st.session_state.user_data['pinjaman_lain'] = cols[1].number_input("Pinjaman Lainnya", min_value=0, value=0)
         
+        st.divider()
+        st.subheader("💳 Detail Utang")
+        for name, label in DEBT_LABELS.items():
+            cols = st.columns(2)
+            st.session_state.user_data[f'bunga_{name}'] = cols[0].number_input(
+                f"Bunga {label} (% p.a.)", min_value=0.0, max_value=100.0,
+                value=DEBT_RATES[name] * 100, step=0.5
+            ) / 100
+            st.session_state.user_data[f'cicilan_{name}'] = cols[1].number_input(
+                f"Cicilan Minimum {label} per Bulan", min_value=0, value=0,
+                help="Isi 0 untuk memakai cicilan anuitas dengan tenor standar"
+            )
+        
         st.divider()
         st.subheader("🎯 Tujuan Keuangan")
         goals = []
@@ -498,6 +430,8 @@ def client_info_form():
 
 def show_financial_analysis(api_key):
     """Tampilkan hasil analisis dan fitur chat"""
+    from simulation import simulate_goal_success
+    
     # Tombol kembali ke input
     col1, col2, col3 = st.columns([1, 3, 1])
     with col2:
@@ -507,9 +441,17 @@ def show_financial_analysis(api_key):
     
     st.divider()
     
-    # Lakukan perhitungan
-    analysis = calculate_financials(st.session_state.user_data)
+    # Lakukan perhitungan (di-cache berdasarkan hash input keuangan)
+    inputs = financial_inputs(st.session_state.user_data)
+    analysis = RESULT_CACHE.get_or_compute(
+        'calculate_financials', inputs, lambda: calculate_financials(inputs)
+    )
     st.session_state.user_data['analysis'] = analysis
+    user_data = st.session_state.user_data
+    surplus = (
+        user_data['pendapatan_tetap'] + user_data['pendapatan_variabel']
+        - user_data['pengeluaran_wajib'] - user_data['pengeluaran_diskresioner']
+    )
     
     # Tampilkan metrik utama
     st.subheader("📊 Hasil Analisis Keuangan")
@@ -523,6 +465,47 @@ def show_financial_analysis(api_key):
     st.subheader("📈 Proyeksi Tujuan Keuangan")
     plot_goals(analysis['goal_projections'])
     
+    # Alokasi surplus ke tujuan berdasarkan prioritas
+    if analysis['goal_projections']:
+        from allocation import allocate_goals
+        
+        st.subheader("🧮 Alokasi Surplus per Prioritas")
+        allocations = RESULT_CACHE.get_or_compute(
+            'allocate_goals',
+            {'goals': analysis['goal_projections'], 'surplus': surplus},
+            lambda: allocate_goals(analysis['goal_projections'], surplus)
+        )
+        show_goal_allocation(allocations, surplus)
+    
+    # Perbandingan strategi pelunasan utang
+    if any(user_data.get(name, 0) > 0 for name in DEBT_RATES):
+        st.subheader("💳 Strategi Pelunasan Utang")
+        show_debt_payoff(user_data, surplus)
+    
+    # Sensitivitas setoran terhadap asumsi inflasi, return dan jangka waktu
+    if analysis['goal_projections']:
+        st.subheader("🌡️ Sensitivitas Setoran terhadap Asumsi")
+        show_sensitivity(analysis['goal_projections'])
+    
+    # Proyeksi arus kas seumur hidup
+    st.subheader("📉 Proyeksi Kekayaan hingga Pensiun")
+    show_lifetime_projection(st.session_state.user_data)
+    
+    # Simulasi Monte Carlo
+    if analysis['goal_projections']:
+        st.subheader("🎲 Simulasi Peluang Tercapainya Tujuan")
+        risk_profile = st.session_state.user_data['risk_profile']
+        simulation = RESULT_CACHE.get_or_compute(
+            'simulate_goal_success',
+            {'goals': analysis['goal_projections'], 'risk_profile': risk_profile},
+            lambda: simulate_goal_success(
+                analysis['goal_projections'],
+                risk_profile=risk_profile,
+                seed=42  # seed tetap agar hasil konsisten di setiap rerun
+            )
+        )
+        show_goal_simulation(simulation)
+    
     # Rekomendasi AI
     st.subheader("🔍 AI Powered Recommendations")
     with st.expander("Lihat Rekomendasi Keuangan", expanded=True):
@@ -535,54 +518,188 @@ def show_financial_analysis(api_key):
         ai_chat_section(api_key)
     
     with report_tab:
-        st.subheader("📥 Unduh Laporan Lengkap")
-        if st.button("🖨️ Generate PDF Report"):
-            report_bytes = generate_pdf_report(st.session_state.user_data)
-            st.download_button(
-                label="⬇️ Download PDF",
-                data=report_bytes,
-                file_name="financial_report.pdf",
-                mime="application/pdf"
-            )
+        report_section(st.session_state.user_data)
+
+@st.fragment
+def report_section(user_data):
+    """Tab laporan PDF; PDF disimpan di sesi selama data klien tidak berubah"""
+    st.subheader("📥 Unduh Laporan Lengkap")
+    report_key = stable_hash(user_data)
+    if st.button("🖨️ Generate PDF Report"):
+        st.session_state.report = (report_key, generate_pdf_report(user_data))
+    
+    report = st.session_state.get("report")
+    if report is not None and report[0] == report_key:
+        st.download_button(
+            label="⬇️ Download PDF",
+            data=report[1],
+            file_name="financial_report.pdf",
+            mime="application/pdf"
+        )
+
+# ====================== RIWAYAT CHAT ======================
+CHAT_GREETING = "Hai! Saya AI Financial Advisor. Bagaimana saya bisa membantu perencanaan keuangan Anda hari ini?"
+CHAT_WINDOW = 20  # pesan terbaru yang ditampilkan
+CHAT_PAGE_SIZE = 20  # pesan lama yang dimuat per klik
+CHAT_CONTEXT_MESSAGES = 60  # pesan terbaru yang dipertimbangkan untuk konteks AI
+AI_POLL_SECONDS = 1  # interval pemeriksaan jawaban AI yang dikerjakan di latar belakang
+
+def load_chat(client_id):
+    """Muat jendela pesan terbaru klien dari penyimpanan ke session state"""
+    messages = CHAT_STORE.recent(client_id, CHAT_WINDOW + 1)
+    st.session_state.chat_client = client_id
+    st.session_state.chat_window = CHAT_WINDOW
+    st.session_state.chat_has_older = len(messages) > CHAT_WINDOW
+    st.session_state.messages = messages[-CHAT_WINDOW:]
+
+def load_older_messages(client_id):
+    """Tambahkan satu halaman pesan lama di awal jendela"""
+    messages = st.session_state.messages
+    older = CHAT_STORE.recent(client_id, CHAT_PAGE_SIZE + 1, before_id=messages[0]['id'])
+    st.session_state.chat_has_older = len(older) > CHAT_PAGE_SIZE
+    older = older[-CHAT_PAGE_SIZE:]
+    st.session_state.messages = older + messages
+    st.session_state.chat_window += len(older)
+
+def append_chat_message(client_id, role, content):
+    """Simpan pesan dan pertahankan ukuran jendela yang ditampilkan"""
+    messages = st.session_state.messages
+    messages.append(CHAT_STORE.append(client_id, role, content))
+    if len(messages) > st.session_state.chat_window:
+        del messages[:len(messages) - st.session_state.chat_window]
+        st.session_state.chat_has_older = True
 
+def save_ai_response(client_id, cache_key, model, response):
+    """Simpan jawaban baru ke riwayat dan ke cache (pesan kesalahan tidak di-cache)"""
+    from ai_client import is_error_response
+    if response and not is_error_response(response):
+        LLM_CACHE.set(cache_key, model, response)
+    append_chat_message(client_id, "assistant", response)
+
+@st.fragment(run_every=AI_POLL_SECONDS)
+def show_pending_response():
+    """Pantau jawaban AI yang dikerjakan scheduler tanpa menahan thread skrip"""
+    from ai_scheduler import AI_SCHEDULER
+    
+    pending = st.session_state.get("pending_response")
+    if pending is None:
+        return
+    future = pending['future']
+    if not future.done():
+        position = AI_SCHEDULER.position(future)
+        with st.chat_message("assistant"):
+            st.caption(f"⏳ Menunggu giliran (antrean ke-{position})" if position else "AI Advisor sedang berpikir...")
+        return
+    
+    del st.session_state.pending_response
+    save_ai_response(pending['client_id'], pending['cache_key'], pending['model'], future.result())
+    st.rerun()
+
+@st.fragment
 def ai_chat_section(api_key):
     """Section untuk chat dengan AI"""
+    from ai_client import TEMPERATURE, is_error_response
+    from ai_scheduler import AI_SCHEDULER
+    from ai_hedge import HEDGE_MODEL, hedged_stream, submit_hedged
+    
     st.info("Anda dapat berkonsultasi lebih lanjut dengan AI Financial Advisor")
     
     # Pilih model AI
     model_options = {
         "deepseek/deepseek-r1-0528-qwen3-8b:free": "DeepSeek R1 (Cepat)",
         "qwen/qwen3-235b-a22b:free": "Qwen 3 235B (Akurat)",
-        "google/gemma-3-12b-it:free": "Gemma 3 12B (Efisien)"
+        "google/gemma-3-12b-it:free": "Gemma 3 12B (Efisien)",
+        HEDGE_MODEL: "⚡ Tercepat Tersedia (otomatis)"
     }
     selected_model = st.selectbox(
         "Pilih Model AI", 
         list(model_options.keys()), 
-        format_func=lambda x: model_options[x]
+        format_func=lambda x: model_options[x],
+        help="Mode tercepat mengirim ke model yang biasanya paling cepat, lalu ke model cadangan jika belum menjawab"
+    )
+    hedge_models = [m for m in model_options if m != HEDGE_MODEL]
+    hedge_delay = st.session_state.get("hedge_delay") or None
+    use_streaming = st.toggle(
+        "Tampilkan jawaban secara streaming", value=True,
+        help="Nonaktifkan untuk menunggu jawaban lengkap sebelum ditampilkan"
+    )
+    use_cache = st.toggle(
+        "Gunakan cache jawaban", value=True,
+        help="Pertanyaan yang sama untuk profil yang sama dijawab dari cache tanpa memanggil API"
     )
     
-    # Tampilkan history chat
+    # Riwayat disimpan per sesi dan klien; muat ulang jendela terbaru jika klien berganti
+    client_id = client_key(st.session_state.user_data, st.session_state.chat_session_id)
+    if st.session_state.get("chat_client") != client_id:
+        load_chat(client_id)
+    if st.session_state.messages and st.button("🗑️ Hapus riwayat chat"):
+        CHAT_STORE.clear(client_id)
+        load_chat(client_id)
+    
+    # Hanya jendela pesan terbaru yang dirender; pesan lama dimuat sesuai permintaan
+    if st.session_state.chat_has_older and st.button("⬆️ Muat pesan sebelumnya"):
+        load_older_messages(client_id)
+    if not st.session_state.chat_has_older:
+        st.chat_message("assistant").write(CHAT_GREETING)
     for msg in st.session_state.messages:
         st.chat_message(msg["role"]).write(msg["content"])
     
-    # Input pengguna
-    if prompt := st.chat_input("Tanyakan seputar perencanaan keuangan..."):
-        st.session_state.messages.append({"role": "user", "content": prompt})
+    # Input pengguna; dinonaktifkan selama jawaban sebelumnya masih diproses
+    pending = st.session_state.get("pending_response") is not None
+    prompt = st.chat_input("Tanyakan seputar perencanaan keuangan...", disabled=pending)
+    if prompt and pending:
+        st.warning("Tunggu jawaban sebelumnya selesai sebelum mengirim pertanyaan baru")
+    elif prompt:
+        append_chat_message(client_id, "user", prompt)
         st.chat_message("user").write(prompt)
         
-        # Dapatkan respons dari AI
-        with st.spinner("AI Advisor sedang berpikir..."):
-            context = json.dumps(st.session_state.user_data, indent=2)
-            full_prompt = f"""
-            Anda adalah financial advisor profesional. Berikut data klien:
-            {context}
-            
-            Pertanyaan: {prompt}
-            """
-            response = get_ai_response(full_prompt, selected_model, api_key)
+        # Susun konteks ringkas dalam anggaran token: profil, riwayat dan pertanyaan.
+        # Pesan kesalahan tidak ikut dikirim.
+        history = [
+            m for m in CHAT_STORE.recent(client_id, CHAT_CONTEXT_MESSAGES + 1)[:-1]
+            if not is_error_response(m["content"])
+        ]
+        full_prompt = build_messages(
+            st.session_state.user_data, history, prompt,
+            token_budget=st.session_state.get("token_budget", DEFAULT_TOKEN_BUDGET)
+        )
+        cache_key = make_key(selected_model, TEMPERATURE, full_prompt, prompt)
+        cached = LLM_CACHE.get(cache_key) if use_cache else None
         
-        st.session_state.messages.append({"role": "assistant", "content": response})
-        st.chat_message("assistant").write(response)
+        if cached is not None:
+            with st.chat_message("assistant"):
+                st.write(cached)
+                st.caption("⚡ Jawaban dari cache")
+            append_chat_message(client_id, "assistant", cached)
+        elif use_streaming:
+            # Dikirim lewat antrean bersama (rate limit per key/model); token ditampilkan begitu tiba
+            with st.chat_message("assistant"):
+                if selected_model == HEDGE_MODEL:
+                    outcome = {}
+                    response = st.write_stream(
+                        hedged_stream(full_prompt, hedge_models, api_key, hedge_delay=hedge_delay, outcome=outcome)
+                    )
+                    if outcome:
+                        st.caption(f"⚡ Dijawab oleh {model_options[outcome['model']]}")
+                else:
+                    response = st.write_stream(AI_SCHEDULER.stream(full_prompt, selected_model, api_key))
+            # Jawaban baru tetap disimpan walau cache dilewati, agar cache tetap segar
+            save_ai_response(client_id, cache_key, selected_model, response)
+        else:
+            # Dikerjakan worker scheduler; show_pending_response memantau hasilnya
+            if selected_model == HEDGE_MODEL:
+                future = submit_hedged(full_prompt, hedge_models, api_key, hedge_delay=hedge_delay)
+            else:
+                future = AI_SCHEDULER.submit_chat(full_prompt, selected_model, api_key)
+            st.session_state.pending_response = {
+                'future': future,
+                'client_id': client_id,
+                'cache_key': cache_key,
+                'model': selected_model
+            }
+    
+    if st.session_state.get("pending_response") is not None:
+        show_pending_response()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,238 @@
+"""Instrumentasi ringan: histogram latensi dan counter per tahap.
+
+Data dikumpulkan per proses dan dapat diekspor sebagai teks Prometheus atau JSON.
+Set FPA_METRICS=0 untuk mematikan pencatatan sepenuhnya, dan FPA_METRICS_FILE
+untuk menulis snapshot Prometheus ke file (pola textfile collector).
+"""
+import bisect
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+ENABLED = os.environ.get("FPA_METRICS", "1") != "0"
+METRICS_FILE = os.environ.get("FPA_METRICS_FILE")
+
+# Batas bucket (detik) untuk latensi tahap, dari perhitungan mikrodetik sampai panggilan AI
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+BYTES_BUCKETS = (1_000, 5_000, 10_000, 50_000, 100_000, 500_000, 1_000_000, 5_000_000)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1_000, 2_000, 4_000, 8_000)
+
+# ====================== JENIS METRIK ======================
+class Histogram:
+    """Histogram kumulatif bergaya Prometheus dengan label"""
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        self.observe_key(value, tuple(sorted(labels.items())))
+
+    def observe_key(self, value, key):
+        """Seperti observe, dengan label yang sudah berupa tuple terurut (jalur cepat)"""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+            series['counts'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {key: {**s, 'counts': list(s['counts'])} for key, s in self._series.items()}
+
+    def quantile(self, q, **labels):
+        """Perkiraan kuantil dengan interpolasi linear di dalam bucket (seperti histogram_quantile)"""
+        series = self.snapshot().get(tuple(sorted(labels.items())))
+        if not series or not series['count']:
+            return None
+        rank = q * series['count']
+        cumulative = 0
+        for i, count in enumerate(series['counts']):
+            if cumulative + count >= rank and count:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                if i == len(self.buckets):
+                    return lower
+                return lower + (self.buckets[i] - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+class Counter:
+    """Counter monoton dengan label"""
+    kind = "counter"
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def inc(self, value=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + value
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._series)
+
+class Gauge:
+    """Nilai terkini (bisa naik turun) dengan label"""
+    kind = "gauge"
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def set(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._series[key] = value
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._series)
+
+# ====================== REGISTRY ======================
+STAGE_SECONDS = Histogram("fpa_stage_seconds", "Latensi per tahap (detik)", LATENCY_BUCKETS)
+STAGE_ERRORS = Counter("fpa_stage_errors_total", "Jumlah tahap yang berakhir dengan exception")
+AI_TOKENS = Histogram("fpa_ai_tokens", "Jumlah token per panggilan AI", TOKEN_BUCKETS)
+HTTP_RESPONSES = Counter("fpa_http_responses_total", "Respons HTTP OpenRouter per kode status")
+HTTP_RETRIES = Counter("fpa_http_retries_total", "Percobaan ulang HTTP OpenRouter per alasan")
+PDF_BYTES = Histogram("fpa_pdf_bytes", "Ukuran laporan PDF (byte)", BYTES_BUCKETS)
+AI_QUEUE_WAIT = Histogram("fpa_ai_queue_wait_seconds", "Waktu tunggu permintaan AI di antrean (detik)", LATENCY_BUCKETS)
+AI_QUEUE_DEPTH = Gauge("fpa_ai_queue_depth", "Permintaan AI yang menunggu di antrean")
+AI_HEDGE_ATTEMPTS = Counter("fpa_ai_hedge_attempts_total", "Permintaan yang dikirim per model dalam mode tercepat")
+AI_HEDGE_WINS = Counter("fpa_ai_hedge_wins_total", "Model yang menjawab paling cepat dalam mode tercepat")
+RULE_HITS = Counter("fpa_rule_hits_total", "Jumlah klien yang terkena aturan rekomendasi")
+
+REGISTRY = [
+    STAGE_SECONDS, STAGE_ERRORS, AI_TOKENS, HTTP_RESPONSES, HTTP_RETRIES, PDF_BYTES,
+    AI_QUEUE_WAIT, AI_QUEUE_DEPTH, AI_HEDGE_ATTEMPTS, AI_HEDGE_WINS, RULE_HITS
+]
+
+@contextmanager
+def timer(stage):
+    """Catat durasi blok kode ke fpa_stage_seconds{stage=...}"""
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage)
+
+def timed(stage):
+    """Dekorator: catat durasi setiap panggilan fungsi sebagai tahap `stage`"""
+    def decorator(func):
+        if not ENABLED:
+            return func
+        key = (('stage', stage),)
+        clock = time.perf_counter
+
+        # Tanpa context manager agar overhead per panggilan tetap di orde mikrodetik
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            except BaseException:
+                STAGE_ERRORS.inc(stage=stage)
+                raise
+            finally:
+                STAGE_SECONDS.observe_key(clock() - start, key)
+        return wrapper
+    return decorator
+
+def observe(metric, value, **labels):
+    """Catat nilai ke histogram jika instrumentasi aktif"""
+    if ENABLED:
+        metric.observe(value, **labels)
+
+def inc(metric, value=1, **labels):
+    """Tambah counter jika instrumentasi aktif"""
+    if ENABLED:
+        metric.inc(value, **labels)
+
+def set_gauge(metric, value, **labels):
+    """Set nilai gauge jika instrumentasi aktif"""
+    if ENABLED:
+        metric.set(value, **labels)
+
+# ====================== EKSPOR ======================
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+def render_prometheus():
+    """Semua metrik dalam format teks eksposisi Prometheus"""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for key, series in sorted(metric.snapshot().items()):
+            if metric.kind in ("counter", "gauge"):
+                lines.append(f"{metric.name}{_format_labels(key)} {series}")
+                continue
+            cumulative = 0
+            for bound, count in zip(metric.buckets + ("+Inf",), series['counts']):
+                cumulative += count
+                lines.append(f"{metric.name}_bucket{_format_labels(key, [('le', bound)])} {cumulative}")
+            lines.append(f"{metric.name}_sum{_format_labels(key)} {series['sum']}")
+            lines.append(f"{metric.name}_count{_format_labels(key)} {series['count']}")
+    return "\n".join(lines) + "\n"
+
+def to_json():
+    """Ringkasan metrik sebagai dict siap-JSON (jumlah, rata-rata, p50, p95 untuk histogram)"""
+    data = {}
+    for metric in REGISTRY:
+        entries = []
+        for key, series in sorted(metric.snapshot().items()):
+            labels = dict(key)
+            if metric.kind in ("counter", "gauge"):
+                entries.append({'labels': labels, 'value': series})
+                continue
+            entries.append({
+                'labels': labels,
+                'count': series['count'],
+                'mean': series['sum'] / series['count'] if series['count'] else None,
+                'p50': metric.quantile(0.5, **labels),
+                'p95': metric.quantile(0.95, **labels)
+            })
+        data[metric.name] = entries
+    return data
+
+def write_metrics_file(path=METRICS_FILE):
+    """Tulis snapshot Prometheus (atau JSON untuk path .json) secara atomik; no-op tanpa path"""
+    if not path or not ENABLED:
+        return
+    content = json.dumps(to_json(), indent=2) if path.endswith(".json") else render_prometheus()
+    # File sementara unik per penulis: banyak sesi Streamlit menulis dari thread berbeda
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".",
+                                    suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.chmod(tmp_path, 0o644)  # mkstemp membuat file 0600; collector perlu membacanya
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
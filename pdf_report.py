@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from fpdf import FPDF
+
+# ====================== FUNGSI LAPORAN PDF ======================
+class PDFReport(FPDF):
+    """Kelas untuk membuat laporan PDF"""
+    def header(self):
+        self.set_font('Arial', 'B', 16)
+        self.cell(0, 10, 'Laporan Perencanaan Keuangan', 0, 1, 'C')
+        self.set_font('Arial', '', 12)
+        self.cell(0, 10, f"Tanggal: {datetime.now().strftime('%d %B %Y')}", 0, 1, 'C')
+        self.ln(10)
+    
+    def chapter_title(self, title):
+        self.set_font('Arial', 'B', 14)
+        self.cell(0, 10, title, 0, 1)
+        self.ln(4)
+    
+    def chapter_body(self, body):
+        self.set_font('Arial', '', 12)
+        self.multi_cell(0, 8, body)
+        self.ln()
@@ -0,0 +1,130 @@
+import numpy as np
+
+from core import DEBT_RATES, INFLATION_RATE, RETURN_RATE, calculate_future_value
+from metrics import timed
+
+LIFE_EXPECTANCY = 85  # usia akhir proyeksi (fase pensiun/drawdown)
+RETIREMENT_EXPENSE_RATIO = 0.7  # pengeluaran saat pensiun relatif terhadap sebelum pensiun
+
+# Asumsi tenor (tahun) untuk amortisasi utang; bunga dari bunga_<utang> atau DEBT_RATES
+DEBT_TENORS = {
+    'kpr': 15,
+    'kartu_kredit': 1,
+    'pinjaman_lain': 3
+}
+DEBT_TERMS = {name: (DEBT_RATES[name], years) for name, years in DEBT_TENORS.items()}
+
+# ====================== PROYEKSI ARUS KAS ======================
+def _amortize(balances, annual_rates, term_years, t, fixed_payments=None):
+    """Cicilan dan sisa pokok per bulan untuk beberapa utang sekaligus.
+
+    `balances`, `annual_rates`, `term_years` dan `fixed_payments` berdimensi
+    (utang,), `t` adalah indeks bulan. Utang dengan `fixed_payments` > 0 dicicil
+    sebesar itu sampai lunas (atau terus, jika tidak menutup bunga); lainnya
+    memakai anuitas selama `term_years`. Hasilnya total cicilan dan total sisa
+    utang per bulan.
+    """
+    balances = np.asarray(balances, dtype=float)[:, None]
+    rates = np.asarray(annual_rates, dtype=float)[:, None] / 12
+    terms = np.maximum(np.rint(np.asarray(term_years, dtype=float) * 12), 1)[:, None]
+
+    has_interest = rates > 0
+    safe_rates = np.where(has_interest, rates, 1.0)
+    payment = np.where(
+        has_interest,
+        balances * safe_rates / (1 - (1 + safe_rates) ** -terms),
+        balances / terms
+    )
+    if fixed_payments is not None:
+        fixed = np.nan_to_num(np.asarray(fixed_payments, dtype=float))[:, None]
+        payment = np.where(fixed > 0, fixed, payment)
+
+    def remaining(months):
+        # Sisa pokok dalam bentuk tertutup: B_t = B0 (1+i)^t - P ((1+i)^t - 1) / i
+        growth = (1 + rates) ** months
+        return np.maximum(np.where(
+            has_interest,
+            balances * growth - payment * (growth - 1) / safe_rates,
+            balances - payment * months
+        ), 0.0)
+
+    # Cicilan terakhir hanya sebesar sisa pokok ditambah bunga bulan itu
+    owed = remaining(np.maximum(t - 1, 0)) * (1 + rates)
+    payments = np.where(t >= 1, np.minimum(payment, owed), 0.0).sum(axis=0)
+    outstanding = remaining(t).sum(axis=0)
+    return payments, outstanding
+
+@timed('project_lifetime')
+def project_lifetime(user_data, life_expectancy=LIFE_EXPECTANCY, return_rate=RETURN_RATE,
+                     inflation_rate=INFLATION_RATE, retirement_expense_ratio=RETIREMENT_EXPENSE_RATIO,
+                     debt_terms=DEBT_TERMS):
+    """Proyeksikan kekayaan bulan per bulan dari usia sekarang sampai `life_expectancy`.
+
+    Pendapatan dan pengeluaran naik mengikuti inflasi; pendapatan berhenti saat
+    usia pensiun dan pengeluaran turun ke `retirement_expense_ratio`. Cicilan
+    utang (`cicilan_<utang>`, atau anuitas sesuai `debt_terms` jika 0 / tidak
+    diisi) dan penarikan dana tujuan (target terinflasi pada tahun tujuan)
+    dibayar dari aset likuid (tabungan + investasi) yang tumbuh sebesar
+    `return_rate`; properti mengikuti inflasi.
+
+    Aset likuid dihitung tanpa loop dengan W_t = G_t * (W_0 + cumsum(arus_kas / G)),
+    G_t = (1 + r)^t. Hasilnya dict berisi array per bulan (indeks 0 = hari ini),
+    ringkasan saat pensiun, usia pertama kali aset likuid negatif dan usia
+    dana pensiun habis (None jika tidak pernah).
+    """
+    usia = user_data['usia']
+    usia_pensiun = user_data['usia_pensiun']
+    # Proyeksi berakhir paling cepat saat pensiun dan paling sedikit satu tahun dari sekarang
+    end_age = max(life_expectancy, usia_pensiun, usia + 1)
+    months = max(int(round((end_age - usia) * 12)), 1)
+    retirement_month = max(int(round((usia_pensiun - usia) * 12)), 0)
+    t = np.arange(months + 1)
+
+    # Indeks harga bulanan yang konsisten dengan inflasi tahunan majemuk
+    price = (1 + inflation_rate) ** (t / 12)
+    working = (t >= 1) & (t <= retirement_month)
+    retired = t > retirement_month
+
+    pendapatan_total = user_data['pendapatan_tetap'] + user_data['pendapatan_variabel']
+    pengeluaran_total = user_data['pengeluaran_wajib'] + user_data['pengeluaran_diskresioner']
+    income = np.where(working, pendapatan_total, 0.0) * price
+    expenses = (working * pengeluaran_total + retired * pengeluaran_total * retirement_expense_ratio) * price
+
+    debt_payments, debt_balance = _amortize(
+        [user_data.get(name, 0) for name in debt_terms],
+        [user_data.get(f'bunga_{name}', rate) for name, (rate, _) in debt_terms.items()],
+        [years for _, years in debt_terms.values()],
+        t,
+        [user_data.get(f'cicilan_{name}', 0) for name in debt_terms]
+    )
+
+    # Penarikan dana tujuan pada bulan jatuh temponya
+    withdrawals = np.zeros(months + 1)
+    for goal in user_data.get('tujuan', []):
+        month = int(goal['tahun']) * 12
+        if 1 <= month <= months:
+            withdrawals[month] += calculate_future_value(goal['target'], goal['tahun'], inflation_rate)
+
+    cash_flow = income - expenses - debt_payments - withdrawals
+    growth = (1 + return_rate / 12) ** t
+    liquid = growth * (user_data['tabungan'] + user_data['investasi'] + np.cumsum(cash_flow / growth))
+    property_value = user_data['properti'] * price
+    net_worth = liquid + property_value - debt_balance
+
+    # Aset likuid negatif berarti kekurangan dana yang harus ditutup dengan utang
+    shortfall = np.flatnonzero(liquid < 0)
+    depleted = shortfall[shortfall > retirement_month]
+    retirement_index = min(retirement_month, months)
+    return {
+        'usia': usia + t / 12,
+        'arus_kas': cash_flow,
+        'aset_likuid': liquid,
+        'properti': property_value,
+        'utang': debt_balance,
+        'net_worth': net_worth,
+        'usia_pensiun': usia_pensiun,
+        'net_worth_pensiun': float(net_worth[retirement_index]),
+        'aset_likuid_pensiun': float(liquid[retirement_index]),
+        'usia_defisit_pertama': float(usia + shortfall[0] / 12) if shortfall.size else None,
+        'usia_dana_habis': float(usia + depleted[0] / 12) if depleted.size else None
+    }
@@ -0,0 +1,107 @@
+import math
+import re
+
+DEFAULT_TOKEN_BUDGET = 1500  # perkiraan token untuk seluruh prompt
+MAX_WINDOW_MESSAGES = 6  # jumlah pesan terbaru yang dikirim utuh
+WINDOW_SHARE = 0.75  # porsi sisa anggaran untuk jendela pesan terbaru; sisanya ringkasan
+
+INSTRUCTION = "Anda adalah financial advisor profesional. Jawab berdasarkan data klien berikut."
+
+# ====================== KONTEKS PROMPT AI ======================
+def estimate_tokens(text):
+    """Perkiraan kasar jumlah token (~4 karakter per token)"""
+    return math.ceil(len(text) / 4)
+
+def _truncate(text, max_tokens):
+    """Potong teks agar muat dalam perkiraan token"""
+    max_chars = max(0, max_tokens * 4)
+    if len(text) <= max_chars:
+        return text
+    return text[:max(0, max_chars - 3)].rstrip() + "..."
+
+def _rp(value):
+    return f"Rp {value:,.0f}"
+
+def summarize_profile(user_data):
+    """Ringkasan profil dan metrik klien yang padat, tanpa teks rekomendasi"""
+    income = user_data['pendapatan_tetap'] + user_data['pendapatan_variabel']
+    expenses = user_data['pengeluaran_wajib'] + user_data['pengeluaran_diskresioner']
+    lines = [
+        f"Profil: {user_data.get('nama') or '-'}, {user_data['usia']} th, pensiun {user_data['usia_pensiun']} th, "
+        f"{user_data['status_keluarga']}, profil risiko {user_data['risk_profile']}/5",
+        f"Arus kas/bulan: pendapatan {_rp(income)} (tetap {_rp(user_data['pendapatan_tetap'])}), "
+        f"pengeluaran {_rp(expenses)} (wajib {_rp(user_data['pengeluaran_wajib'])})",
+        f"Aset: tabungan {_rp(user_data['tabungan'])}, investasi {_rp(user_data['investasi'])}, "
+        f"properti {_rp(user_data['properti'])}",
+        f"Utang: KPR {_rp(user_data['kpr'])}, kartu kredit {_rp(user_data['kartu_kredit'])}, "
+        f"lainnya {_rp(user_data['pinjaman_lain'])}"
+    ]
+
+    analysis = user_data.get('analysis')
+    if analysis:
+        lines.append(
+            f"Metrik: net worth {_rp(analysis['net_worth'])}, likuiditas {analysis['liquidity_ratio']} bulan, "
+            f"DTI {analysis['dti_ratio']:.2f}, savings rate {analysis['savings_rate']:.0%}"
+        )
+        goals = [
+            f"{g['nama']} {_rp(g['target_sekarang'])} dalam {g['jangka_waktu']} th "
+            f"(setoran {_rp(g['setoran_bulanan'])}/bln)"
+            for g in analysis['goal_projections']
+        ]
+    else:
+        goals = [f"{g['nama']} {_rp(g['target'])} dalam {g['tahun']} th" for g in user_data.get('tujuan', [])]
+    if goals:
+        lines.append("Tujuan: " + "; ".join(goals))
+    return "\n".join(lines)
+
+def summarize_history(messages, max_tokens):
+    """Ringkas pesan lama secara ekstraktif: kalimat pertama tiap pesan, terbaru diutamakan"""
+    labels = {"user": "Klien", "assistant": "Advisor"}
+    lines = []
+    used = 0
+    for msg in reversed(messages):
+        first_sentence = re.split(r"(?<=[.!?])\s|\n", msg["content"].strip(), maxsplit=1)[0]
+        line = f"- {labels.get(msg['role'], msg['role'])}: {_truncate(first_sentence, 30)}"
+        cost = estimate_tokens(line) + 1
+        if used + cost > max_tokens:
+            break
+        lines.append(line)
+        used += cost
+    return "\n".join(reversed(lines))
+
+def build_messages(user_data, history, question, token_budget=DEFAULT_TOKEN_BUDGET,
+                   summarizer=summarize_history):
+    """Susun pesan chat dalam anggaran token: ringkasan profil, ringkasan riwayat lama,
+    jendela pesan terbaru dan pertanyaan.
+
+    `history` adalah pesan sebelumnya ({'role', 'content'}) tanpa pertanyaan saat ini.
+    `summarizer(messages, max_tokens)` bisa diganti, misalnya dengan ringkasan oleh LLM.
+    """
+    profile = summarize_profile(user_data)
+    fixed = estimate_tokens(INSTRUCTION) + estimate_tokens(profile) + estimate_tokens(question) + 8
+    remaining = max(0, token_budget - fixed)
+
+    # Jendela pesan terbaru, diambil dari yang paling baru selama muat
+    window_budget = int(remaining * WINDOW_SHARE)
+    window = []
+    used = 0
+    for msg in reversed(history[-MAX_WINDOW_MESSAGES:]):
+        cost = estimate_tokens(msg["content"]) + 4
+        if used + cost > window_budget:
+            if not window and window_budget > 4:
+                # Pesan terakhir terlalu panjang: kirim versi terpotong
+                window.append({"role": msg["role"], "content": _truncate(msg["content"], window_budget - 4)})
+                used = window_budget
+            break
+        window.append({"role": msg["role"], "content": msg["content"]})
+        used += cost
+    window.reverse()
+
+    # Pesan yang lebih lama diringkas dengan sisa anggaran
+    older = history[:len(history) - len(window)]
+    summary = summarizer(older, remaining - used) if older and remaining - used > 0 else ""
+
+    context = f"{INSTRUCTION}\n{profile}"
+    if summary:
+        context += f"\n\nRingkasan percakapan sebelumnya:\n{summary}"
+    return window + [{"role": "user", "content": f"{context}\n\nPertanyaan: {question}"}]
@@ -0,0 +1,196 @@
+"""Mesin aturan rekomendasi berbasis konfigurasi JSON.
+
+Aturan, ambang batas dan pesan dibaca dari `recommendation_rules.json` (atau
+FPA_RULES_PATH) lalu dikompilasi sekali menjadi fungsi NumPy. Fungsi yang sama
+dievaluasi untuk satu klien (skalar) maupun tabel klien (array per kolom),
+sehingga UI dan analisis massal memakai aturan yang identik.
+
+Ekspresi ditulis sebagai list prefiks, misalnya ["<", "tabungan", "dana_darurat"].
+Nama merujuk ke `params` (konstanta), `derived` (dihitung berurutan), metrik
+dasar (METRIC_NAMES) atau kolom klien. Operator: + - * / min max clip
+< <= > >= == and or not lookup.
+"""
+import json
+import operator
+import os
+import string
+from functools import reduce
+
+import numpy as np
+
+from batch import CLIENT_COLUMNS
+from metrics import RULE_HITS, inc
+
+RULES_PATH = os.environ.get(
+    "FPA_RULES_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "recommendation_rules.json")
+)
+METRIC_NAMES = ('pendapatan_total', 'pengeluaran_total', 'net_worth', 'dti_ratio', 'savings_rate', 'liquidity_ratio')
+# Nilai kolom klien opsional jika tidak diisi; risk_profile 3 = netral, sama dengan default form
+DEFAULT_INPUTS = {'risk_profile': 3}
+
+def _lookup(values, table, default):
+    """Petakan nilai (misalnya risk_profile) lewat tabel; nilai lain memakai default"""
+    values = np.asarray(values)
+    if values.ndim == 0:
+        return np.float64(table.get(values.item(), default))
+    result = np.full(values.shape, default, dtype=float)
+    for key, value in table.items():
+        result[values == key] = value
+    return result
+
+_OPERATORS = {
+    '+': lambda *args: reduce(operator.add, args),
+    '-': operator.sub,
+    '*': lambda *args: reduce(operator.mul, args),
+    '/': operator.truediv,
+    'min': lambda *args: reduce(np.minimum, args),
+    'max': lambda *args: reduce(np.maximum, args),
+    'clip': lambda value, low, high: np.minimum(np.maximum(value, low), high),
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq,
+    'and': lambda *args: reduce(np.logical_and, args),
+    'or': lambda *args: reduce(np.logical_or, args),
+    'not': np.logical_not
+}
+
+# ====================== KOMPILASI ======================
+def _compile(node, params, names):
+    """Ubah ekspresi JSON menjadi fungsi env -> nilai; `names` mengumpulkan nama yang dirujuk"""
+    if isinstance(node, bool) or not isinstance(node, (int, float, str, list)):
+        raise ValueError(f"Ekspresi aturan tidak valid: {node!r}")
+    if isinstance(node, (int, float)):
+        return lambda env: node
+    if isinstance(node, str):
+        if node in params:
+            value = params[node]
+            return lambda env: value
+        names.add(node)
+        return lambda env: env[node]
+
+    op, *args = node
+    if op == 'lookup':
+        source, table, default = args
+        table = {float(key): value for key, value in table.items()}
+        values = _compile(source, params, names)
+        return lambda env: _lookup(values(env), table, default)
+    if op not in _OPERATORS:
+        raise ValueError(f"Operator aturan tidak dikenal: {op}")
+    func = _OPERATORS[op]
+    compiled = [_compile(arg, params, names) for arg in args]
+    return lambda env: func(*(c(env) for c in compiled))
+
+def _template_fields(message):
+    return {field for _, field, _, _ in string.Formatter().parse(message) if field}
+
+def _scalar(value, index):
+    """Nilai Python untuk format pesan (dari skalar NumPy atau elemen array)"""
+    value = np.asarray(value)
+    return (value if value.ndim == 0 else value[index]).item()
+
+class RuleSet:
+    """Aturan rekomendasi yang sudah dikompilasi"""
+    def __init__(self, config):
+        self.params = dict(config.get('params', {}))
+        names = set()
+        self._derived = []
+        for name, expression in config.get('derived', {}).items():
+            self._derived.append((name, _compile(expression, self.params, names)))
+        self.rules = []
+        for rule in config['rules']:
+            when = rule.get('when')
+            fields = _template_fields(rule['message'])
+            names.update(f for f in fields if f not in self.params)
+            self.rules.append({
+                'id': rule['id'],
+                'when': _compile(when, self.params, names) if when is not None else None,
+                'message': rule['message'],
+                'fields': fields
+            })
+        derived = {name for name, _ in self._derived}
+        # Kolom klien yang harus ada selain kolom untuk metrik dasar
+        self.input_columns = sorted(names - derived - set(METRIC_NAMES) - set(CLIENT_COLUMNS))
+
+    @classmethod
+    def from_file(cls, path=RULES_PATH):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    @property
+    def rule_ids(self):
+        return [rule['id'] for rule in self.rules]
+
+    def _environment(self, columns, metrics=None):
+        """Kolom klien + metrik dasar + nilai turunan; `metrics` menimpa metrik yang sudah dihitung"""
+        env = dict(columns)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            env['pendapatan_total'] = env['pendapatan_tetap'] + env['pendapatan_variabel']
+            env['pengeluaran_total'] = env['pengeluaran_wajib'] + env['pengeluaran_diskresioner']
+            liabilities = env['kpr'] + env['kartu_kredit'] + env['pinjaman_lain']
+            env['net_worth'] = env['tabungan'] + env['investasi'] + env['properti'] - liabilities
+            env['dti_ratio'] = liabilities / env['pendapatan_total']
+            env['savings_rate'] = (env['pendapatan_total'] - env['pengeluaran_total']) / env['pendapatan_total']
+            env['liquidity_ratio'] = env['tabungan'] / (env['pengeluaran_total'] / 3)
+            env.update(metrics or {})
+            for name, expression in self._derived:
+                env[name] = expression(env)
+        return env
+
+    def _evaluate(self, env, size=None):
+        """Mask boolean per aturan (aturan tanpa `when` selalu aktif); bool biasa jika `size` None"""
+        hits = {}
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for rule in self.rules:
+                hit = True if rule['when'] is None else rule['when'](env)
+                if size is None:
+                    hit = bool(hit)
+                    count = int(hit)
+                else:
+                    hit = np.broadcast_to(np.asarray(hit, dtype=bool), (size,))
+                    count = int(np.count_nonzero(hit))
+                hits[rule['id']] = hit
+                inc(RULE_HITS, count, rule=rule['id'])
+        return hits
+
+    def _message(self, rule, env, index):
+        values = {f: self.params[f] if f in self.params else _scalar(env[f], index) for f in rule['fields']}
+        return rule['message'].format(**values)
+
+    def recommend(self, user_data, net_worth=None, dti=None, savings_rate=None):
+        """Teks rekomendasi untuk satu klien; metrik yang diberikan dipakai apa adanya"""
+        user_data = {**DEFAULT_INPUTS, **user_data}
+        columns = {name: np.float64(user_data[name]) for name in (*CLIENT_COLUMNS, *self.input_columns)}
+        metrics = {
+            name: np.float64(value)
+            for name, value in (('net_worth', net_worth), ('dti_ratio', dti), ('savings_rate', savings_rate))
+            if value is not None
+        }
+        env = self._environment(columns, metrics)
+        hits = self._evaluate(env)
+        return "\n\n".join(self._message(rule, env, 0) for rule in self.rules if hits[rule['id']])
+
+    def evaluate_batch(self, clients):
+        """Mask aturan untuk tabel klien: DataFrame boolean, satu kolom per aturan, indeks sama"""
+        import pandas as pd
+        from batch import _as_frame
+
+        clients = _as_frame(clients)
+        names = (*CLIENT_COLUMNS, *self.input_columns)
+        missing = [c for c in names if c not in clients.columns and c not in DEFAULT_INPUTS]
+        if missing:
+            raise KeyError(f"Kolom klien tidak ditemukan: {', '.join(missing)}")
+        columns = {
+            name: clients[name].to_numpy(dtype=float) if name in clients.columns
+            else np.full(len(clients), DEFAULT_INPUTS[name], dtype=float)
+            for name in names
+        }
+        hits = self._evaluate(self._environment(columns), len(clients))
+        return pd.DataFrame(hits, index=clients.index)
+
+def hit_counts(hits):
+    """Jumlah klien yang terkena tiap aturan dari hasil evaluate_batch"""
+    return {rule_id: int(count) for rule_id, count in hits.sum().items()}
+
+RULES = RuleSet.from_file()
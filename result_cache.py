@@ -0,0 +1,71 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+# Kunci user_data yang tidak memengaruhi hasil perhitungan
+NON_FINANCIAL_KEYS = ('nama', 'analysis')
+
+# ====================== CACHE HASIL PERHITUNGAN ======================
+def stable_hash(obj):
+    """Hash SHA-256 yang stabil antar proses untuk struktur JSON (urutan key diabaikan)"""
+    payload = json.dumps(obj, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def financial_inputs(user_data):
+    """Ambil bagian user_data yang menjadi input perhitungan keuangan"""
+    return {k: v for k, v in user_data.items() if k not in NON_FINANCIAL_KEYS}
+
+class ResultCache:
+    """Cache LRU berukuran terbatas yang aman dipakai bersama oleh banyak sesi (thread)"""
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, namespace, inputs, compute):
+        """Kembalikan hasil untuk (namespace, inputs); hitung lewat `compute()` jika belum ada.
+
+        Hasil dibagi antar sesi sehingga harus diperlakukan read-only.
+        """
+        key = (namespace, stable_hash(inputs))
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+
+        # Hitung di luar lock agar sesi lain tidak ikut menunggu
+        value = compute()
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def stats(self):
+        """Statistik cache untuk ditampilkan di UI"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'size': len(self._data),
+                'maxsize': self.maxsize
+            }
+
+    def clear(self):
+        """Kosongkan cache dan reset penghitung"""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+# Satu instance per proses server, dipakai bersama oleh semua sesi Streamlit
+RESULT_CACHE = ResultCache()
@@ -0,0 +1,42 @@
+import numpy as np
+
+INFLATION_RANGE = (0.0, 0.15)  # rentang inflasi tahunan di grid
+RETURN_RANGE = (0.0, 0.20)  # rentang return tahunan di grid
+HORIZON_RANGE = (1, 40)  # rentang jangka waktu (tahun)
+DEFAULT_RESOLUTION = 101  # jumlah titik per sumbu inflasi/return
+
+# ====================== GRID SENSITIVITAS ======================
+def grid_axes(resolution=DEFAULT_RESOLUTION, inflation_range=INFLATION_RANGE,
+              return_range=RETURN_RANGE, horizon_range=HORIZON_RANGE):
+    """Sumbu grid: inflasi, return (titik merata) dan jangka waktu (tahun bulat)"""
+    return (
+        np.linspace(*inflation_range, resolution),
+        np.linspace(*return_range, resolution),
+        np.arange(horizon_range[0], horizon_range[1] + 1)
+    )
+
+def monthly_savings_grid(present_value, inflation_rates, return_rates, years):
+    """Setoran bulanan untuk semua kombinasi inflasi x return x jangka waktu sekaligus.
+
+    Versi broadcast dari calculate_future_value lalu calculate_monthly_savings:
+    hasil `setoran_bulanan` berdimensi (inflasi, return, tahun) dan
+    `target_masa_depan` berdimensi (inflasi, tahun). (1 + r)^n - 1 dihitung
+    lewat expm1/log1p agar tetap akurat untuk return mendekati nol, dan
+    return nol memakai target / jumlah bulan.
+    """
+    inflation = np.asarray(inflation_rates, dtype=float)[:, None]
+    r = np.asarray(return_rates, dtype=float)[:, None] / 12
+    years = np.asarray(years, dtype=float)[None, :]
+    months = years * 12
+
+    future_value = present_value * np.exp(years * np.log1p(inflation))  # (inflasi, tahun)
+    growth_minus_one = np.expm1(months * np.log1p(r))  # (return, tahun)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        annuity = np.where(r != 0, r / growth_minus_one, 1 / months)  # setoran per rupiah target
+    return {
+        'inflasi': np.asarray(inflation_rates, dtype=float),
+        'return': np.asarray(return_rates, dtype=float),
+        'tahun': years[0],
+        'target_masa_depan': future_value,
+        'setoran_bulanan': future_value[:, None, :] * annuity[None, :, :]
+    }
@@ -0,0 +1,214 @@
+"""Layanan HTTP lokal untuk mesin perhitungan (tanpa Streamlit).
+
+Endpoint:
+    GET  /health    status layanan
+    GET  /metrics   metrik format Prometheus (/metrics.json untuk JSON)
+    POST /analyze   user_data (objek) atau daftar user_data -> hasil analisis JSON
+    POST /report    user_data -> laporan PDF (application/pdf)
+
+Contoh:
+    python service.py --port 8080 --workers 4
+    curl -X POST localhost:8080/analyze -d @klien.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from core import calculate_financials, generate_pdf_report, with_analysis
+from metrics import PDF_BYTES, observe, render_prometheus, timer, to_json
+
+MAX_BODY_BYTES = 10 * 1024 * 1024
+MAX_HEADER_LINES = 100
+KEEP_ALIVE_TIMEOUT = 15  # detik menunggu permintaan berikutnya di koneksi yang sama
+
+STATUS_TEXT = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    413: 'Payload Too Large', 422: 'Unprocessable Entity', 500: 'Internal Server Error',
+    501: 'Not Implemented'
+}
+
+class HTTPError(Exception):
+    """Kesalahan yang dikembalikan ke klien sebagai respons JSON"""
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+# ====================== TUGAS WORKER ======================
+def _analyze(payload):
+    """Analisis satu atau banyak user_data; dijalankan di proses worker"""
+    if isinstance(payload, list):
+        return [calculate_financials(user_data) for user_data in payload]
+    return calculate_financials(payload)
+
+def _render_report(user_data):
+    """Render laporan PDF; dijalankan di proses worker"""
+    return generate_pdf_report(with_analysis(user_data))
+
+# ====================== SERVER ======================
+class AnalysisService:
+    """Server HTTP asyncio dengan jumlah pekerjaan CPU bersamaan yang dibatasi.
+
+    Perhitungan berjalan di process pool; semaphore membatasi jumlah tugas
+    yang sedang diproses sehingga permintaan berlebih menunggu di event loop
+    alih-alih menumpuk di antrean pool.
+    """
+    def __init__(self, workers=None, max_concurrency=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_concurrency = max_concurrency or self.workers * 2
+        self._pool = None
+        self._slots = None
+
+    async def _run(self, func, *args):
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, func, *args)
+
+    async def handle_request(self, method, path, body):
+        """Proses satu permintaan; kembalikan (status, content_type, body_bytes)"""
+        if path == '/health':
+            if method != 'GET':
+                raise HTTPError(405, "Gunakan GET")
+            return 200, 'application/json', b'{"status":"ok"}'
+        if path == '/metrics':
+            return 200, 'text/plain; version=0.0.4', render_prometheus().encode('utf-8')
+        if path == '/metrics.json':
+            return 200, 'application/json', json.dumps(to_json()).encode('utf-8')
+
+        if path not in ('/analyze', '/report'):
+            raise HTTPError(404, f"Endpoint {path} tidak ditemukan")
+        if method != 'POST':
+            raise HTTPError(405, "Gunakan POST")
+        try:
+            payload = json.loads(body or b'null')
+        except ValueError as e:
+            raise HTTPError(400, f"JSON tidak valid: {e}")
+
+        try:
+            if path == '/analyze':
+                if not isinstance(payload, (dict, list)):
+                    raise HTTPError(400, "Body harus objek user_data atau daftar user_data")
+                with timer('service_analyze'):
+                    result = await self._run(_analyze, payload)
+                return 200, 'application/json', json.dumps(result).encode('utf-8')
+            if not isinstance(payload, dict):
+                raise HTTPError(400, "Body harus objek user_data")
+            # Tahap diukur di sini karena metrik worker proses tidak terlihat oleh server
+            with timer('service_report'):
+                pdf_bytes = await self._run(_render_report, payload)
+            observe(PDF_BYTES, len(pdf_bytes))
+            return 200, 'application/pdf', pdf_bytes
+        except (KeyError, TypeError, ValueError, ZeroDivisionError) as e:
+            raise HTTPError(422, f"Data klien tidak valid: {e!r}")
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), KEEP_ALIVE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line:
+                    break
+                keep_alive = await self._serve_one(request_line, reader, writer)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _serve_one(self, request_line, reader, writer):
+        """Baca satu permintaan HTTP/1.1, tulis responsnya; kembalikan True jika koneksi dipertahankan"""
+        keep_alive = False
+        try:
+            try:
+                method, target, version = request_line.decode('latin-1').split()
+            except ValueError:
+                raise HTTPError(400, "Request line tidak valid")
+            headers = {}
+            for _ in range(MAX_HEADER_LINES):
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            else:
+                raise HTTPError(400, "Header terlalu banyak")
+
+            connection = headers.get('connection', '').lower()
+            keep_alive = connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+
+            if 'transfer-encoding' in headers:
+                # Body chunked tidak didukung; tanpa batas yang pasti sisa data di koneksi
+                # bisa terbaca sebagai permintaan berikutnya
+                keep_alive = False
+                if 'content-length' in headers:
+                    raise HTTPError(400, "Transfer-Encoding dan Content-Length tidak boleh dipakai bersamaan")
+                raise HTTPError(501, "Transfer-Encoding tidak didukung; kirim body dengan Content-Length")
+
+            content_length = headers.get('content-length') or '0'
+            if not (content_length.isascii() and content_length.isdigit()):
+                # Batas body tidak diketahui: sisa data di koneksi tidak bisa dipakai lagi
+                keep_alive = False
+                raise HTTPError(400, "Content-Length tidak valid")
+            length = int(content_length)
+            if length > MAX_BODY_BYTES:
+                keep_alive = False
+                raise HTTPError(413, f"Body melebihi {MAX_BODY_BYTES} byte")
+            body = await reader.readexactly(length) if length else b''
+
+            status, content_type, payload = await self.handle_request(method, target.split('?')[0], body)
+        except HTTPError as e:
+            status, content_type = e.status, 'application/json'
+            payload = json.dumps({'error': e.message}).encode('utf-8')
+        except (ConnectionError, asyncio.IncompleteReadError):
+            raise
+        except Exception as e:
+            status, content_type = 500, 'application/json'
+            payload = json.dumps({'error': str(e)}).encode('utf-8')
+
+        head = (
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + payload)
+        await writer.drain()
+        return keep_alive
+
+    async def serve(self, host='127.0.0.1', port=8080):
+        """Jalankan server sampai dihentikan"""
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            self._pool = pool
+            server = await asyncio.start_server(self._handle_connection, host, port)
+            print(
+                f"Layanan analisis berjalan di http://{host}:{port} "
+                f"({self.workers} worker, maks {self.max_concurrency} tugas bersamaan)",
+                file=sys.stderr
+            )
+            async with server:
+                await server.serve_forever()
+
+# ====================== CLI ======================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Layanan HTTP lokal untuk analisis keuangan dan laporan PDF")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('-w', '--workers', type=int, default=None, help="Jumlah proses worker")
+    parser.add_argument('--max-concurrency', type=int, default=None,
+                        help="Maksimum tugas yang diproses bersamaan (default: 2x worker)")
+    args = parser.parse_args(argv)
+    service = AnalysisService(args.workers, args.max_concurrency)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
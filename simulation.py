@@ -0,0 +1,99 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from core import INFLATION_RATE
+
+# Asumsi return tahunan (rata-rata, volatilitas) per profil risiko 1-5
+RISK_PROFILES = {
+    1: (0.05, 0.04),
+    2: (0.07, 0.08),
+    3: (0.09, 0.12),
+    4: (0.11, 0.16),
+    5: (0.13, 0.20)
+}
+INFLATION_VOLATILITY = 0.015  # volatilitas inflasi tahunan
+
+DEFAULT_PATHS = 10_000
+DEFAULT_CHUNK_SIZE = 2_000
+# Di atas jumlah path x bulan ini simulasi dibagi ke process pool
+PARALLEL_THRESHOLD = 20_000_000
+PERCENTILES = (10, 50, 90)
+
+# ====================== SIMULASI MONTE CARLO ======================
+def _monthly_log_params(annual_mean, annual_vol):
+    """Ubah asumsi tahunan menjadi parameter log-return bulanan"""
+    sigma = annual_vol / np.sqrt(12)
+    mu = np.log1p(annual_mean) / 12 - sigma ** 2 / 2
+    return mu, sigma
+
+def _simulate_chunk(seed, n_paths, months, contributions, targets, risk_profile):
+    """Simulasikan satu potongan path; kembalikan kekayaan akhir dan target terinflasi per tujuan"""
+    rng = np.random.default_rng(seed)
+    horizon = int(months.max())
+    ret_mu, ret_sigma = _monthly_log_params(*RISK_PROFILES[risk_profile])
+    inf_mu, inf_sigma = _monthly_log_params(INFLATION_RATE, INFLATION_VOLATILITY)
+
+    # Pertumbuhan kumulatif G_t dan jumlah diskonto S_t = sum(1 / G_k), k <= t.
+    # Setoran c di akhir tiap bulan menghasilkan W_n = c * G_n * S_n.
+    log_growth = rng.normal(ret_mu, ret_sigma, size=(n_paths, horizon)).cumsum(axis=1)
+    discount_sum = np.exp(-log_growth).cumsum(axis=1)
+    log_inflation = rng.normal(inf_mu, inf_sigma, size=(n_paths, horizon)).cumsum(axis=1)
+
+    idx = months - 1
+    wealth = contributions * np.exp(log_growth[:, idx]) * discount_sum[:, idx]
+    inflated_targets = targets * np.exp(log_inflation[:, idx])
+    return wealth, inflated_targets
+
+def simulate_goal_success(goal_projections, risk_profile=3, n_paths=DEFAULT_PATHS, seed=None,
+                          chunk_size=DEFAULT_CHUNK_SIZE, n_workers=None):
+    """Simulasikan peluang tercapainya tiap tujuan dengan return dan inflasi stokastik.
+
+    Setiap tujuan disetor sebesar `setoran_bulanan` hasil `calculate_financials`
+    selama `jangka_waktu` tahun. Semua tujuan klien berbagi path pasar yang sama.
+    Path dibagi per potongan `chunk_size` dengan seed turunan dari `seed`,
+    sehingga hasil identik berapa pun jumlah worker. Run besar dijalankan di
+    process pool (`n_workers=1` memaksa eksekusi di proses ini).
+    """
+    if not goal_projections:
+        return []
+    if risk_profile not in RISK_PROFILES:
+        raise ValueError(f"Profil risiko harus 1-5, bukan {risk_profile}")
+
+    # Tujuan dengan jangka waktu 0 dinilai di akhir bulan pertama (indeks bulan tidak boleh -1)
+    months = np.maximum([int(g['jangka_waktu']) * 12 for g in goal_projections], 1)
+    contributions = np.array([g['setoran_bulanan'] for g in goal_projections], dtype=float)
+    targets = np.array([g['target_sekarang'] for g in goal_projections], dtype=float)
+
+    sizes = [min(chunk_size, n_paths - start) for start in range(0, n_paths, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(s, n, months, contributions, targets, risk_profile) for s, n in zip(seeds, sizes)]
+
+    if n_workers is None:
+        large = n_paths * int(months.max()) >= PARALLEL_THRESHOLD
+        n_workers = min(len(jobs), os.cpu_count() or 1) if large else 1
+
+    if n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            results = list(pool.map(_simulate_chunk, *zip(*jobs)))
+    else:
+        results = [_simulate_chunk(*job) for job in jobs]
+
+    wealth = np.concatenate([w for w, _ in results])
+    inflated_targets = np.concatenate([t for _, t in results])
+    success = (wealth >= inflated_targets).mean(axis=0)
+    bands = np.percentile(wealth, PERCENTILES, axis=0)
+    median_targets = np.median(inflated_targets, axis=0)
+
+    summary = []
+    for i, goal in enumerate(goal_projections):
+        item = {
+            'nama': goal['nama'],
+            'peluang_sukses': float(success[i]),
+            'target_median': float(median_targets[i])
+        }
+        for p, band in zip(PERCENTILES, bands):
+            item[f'p{p}'] = float(band[i])
+        summary.append(item)
+    return summary